@@ -8,95 +8,2102 @@ addition, the task manager should allows for different types of tasks: a
 task with no due date and a task with a due date.
 """
 
-from datetime import datetime
-import re
+from array import array
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+import bisect
+import heapq
+from itertools import chain, compress, islice
+import operator
 import pickle
 import os
-from pathlib import Path
+import struct
+import sys
+import time
+
+# csv, json and sqlite3 are imported where they are used, so that
+# commands which don't need them (e.g. --list on the default backend)
+# don't pay for importing them at startup. (re is imported by pickle
+# anyway; it is imported locally only to keep it next to its use.)
+HOME = os.path.expanduser("~")
 
 
 class Task:
     """Representation of a task
 
-    Attributes:
-                - created - date
-                - completed - date
-                - name - string
-                - unique_id - number
-                - priority - int value of 1, 2, or 3; 1 is default
-                - due_date - date, this is optional
+    Attributes:
+                - created - date
+                - completed - date
+                - name - string
+                - unique_id - number
+                - priority - int value of 1, 2, or 3; 1 is default
+                - due_date - date, this is optional
+    """
+
+    # Slots instead of a per-instance __dict__ save about 100 bytes per
+    # task, which adds up with many tasks resident (see benchmarks.py).
+    __slots__ = ("created", "completed", "name", "unique_id", "priority", "due_date")
+
+    _id_counter = 1
+
+    def __init__(self, name, priority=1, due=None):
+        self.created = datetime.now()
+        self.completed = None
+        self.name = name
+        self.unique_id = Task._id_counter
+        Task._id_counter += 1
+        self.priority = priority
+        self.due_date = due
+
+    def __getstate__(self):
+        return {slot: getattr(self, slot) for slot in Task.__slots__}
+
+    def __setstate__(self, state):
+        """Restore a pickled task.
+
+        Accepts the attribute dict written before tasks had slots, as well
+        as the (None, slots) pair pickle uses for slotted objects.
+        """
+        if isinstance(state, tuple):
+            state = state[1]
+        for slot, value in state.items():
+            setattr(self, slot, value)
+
+    def mark_complete(self):
+        """Mark the task as completed with current date/time"""
+        self.completed = datetime.now()
+
+    @classmethod
+    def set_id_counter(cls, value):
+        """Set the ID counter to a specific value.
+        
+        Args:
+            value (int): The new ID counter value
+            
+        Raises:
+            ValueError: If value is not a positive integer
+        """
+        if not isinstance(value, int) or value < 1:
+            raise ValueError("ID must be a positive integer")
+        cls._id_counter = value
+
+    def __repr__(self):
+        return (f"Task(id={self.unique_id}, name='{self.name}', priority={self.priority}, "
+                f"created={self.created}, due={self.due_date}, completed={self.completed})")
+
+    def __str__(self):
+        status = "Completed" if self.completed else "Incomplete"
+        due_str = f", Due: {self.due_date}" if self.due_date else ""
+        return f"[{self.unique_id}] {self.name} (Priority: {self.priority}) - {status}{due_str}"
+
+
+def sort_key(task):
+    """Return the key that orders tasks for display.
+
+    Tasks with due dates come first, by due date; tasks without come
+    last. Within each group, higher priority comes first, and ties keep
+    the order tasks were created in.
+    """
+    due = task.due_date
+    return (due is None, due.toordinal() if due is not None else 0, -task.priority, task.unique_id)
+
+
+def select_ordered(tasks, after=None, limit=None):
+    """Return tasks in display order, without sorting more than needed.
+
+    With a limit, only the first `limit` tasks are selected, using a heap
+    of that size instead of sorting all of them.
+
+    Args:
+        tasks: Iterable of Task objects
+        after (tuple or None): Only include tasks whose sort key is
+            greater than this one
+        limit (int or None): Maximum number of tasks to return
+
+    Returns:
+        list: The selected tasks in display order
+    """
+    if after is not None:
+        tasks = (task for task in tasks if sort_key(task) > after)
+    if limit is None:
+        return sorted(tasks, key=sort_key)
+    return heapq.nsmallest(limit, tasks, key=sort_key)
+
+
+def encode_cursor(task):
+    """Return a cursor string that resumes a listing after `task`."""
+    return ":".join(str(int(part)) for part in sort_key(task))
+
+
+def decode_cursor(cursor):
+    """Turn a cursor string from `encode_cursor` back into a sort key.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        no_due, due_ordinal, neg_priority, task_id = (int(part) for part in cursor.split(":"))
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return (bool(no_due), due_ordinal, neg_priority, task_id)
+
+
+@lru_cache(maxsize=4096)
+def format_due_date(due):
+    """Format a due date for display, e.g. "03/20/2025".
+
+    Many tasks share a due date, so results are cached.
+    """
+    return due.strftime("%m/%d/%Y")
+
+
+def format_timestamp(moment):
+    """Format a created/completed timestamp for display.
+
+    The format has one-second resolution, so results are cached per
+    second; tasks created or completed in bulk share a cache entry.
+    """
+    return _format_second(moment.replace(microsecond=0))
+
+
+@lru_cache(maxsize=4096)
+def _format_second(moment):
+    return moment.strftime("%a %b %d %H:%M:%S %Z %Y")
+
+
+OUTPUT_FORMATS = ("table", "ndjson", "csv", "tsv")
+RECORD_FIELDS = ("id", "name", "priority", "due_date", "created", "completed")
+
+
+def check_format(fmt):
+    """Raise ValueError unless `fmt` is one of `OUTPUT_FORMATS`."""
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Output format must be one of: {', '.join(OUTPUT_FORMATS)}")
+
+
+def task_record(task):
+    """Return a task as a tuple of `RECORD_FIELDS` values.
+
+    Dates and timestamps are ISO 8601 strings; a missing due date or
+    completion time is None.
+    """
+    return (
+        task.unique_id,
+        task.name,
+        task.priority,
+        task.due_date.isoformat() if task.due_date else None,
+        task.created.isoformat(),
+        task.completed.isoformat() if task.completed else None,
+    )
+
+
+def write_records(tasks, fmt, out):
+    """Stream tasks to `out` as machine-readable records.
+
+    Each task is written as soon as it is read from `tasks`, so output
+    starts immediately and memory use does not grow with the number of
+    tasks.
+
+    Args:
+        tasks: Iterable of Task objects
+        fmt (str): "ndjson" for one JSON object per line, or "csv" or
+            "tsv" for a header row followed by one row per task
+        out: Text stream to write to
+    """
+    import csv
+    import json
+
+    if fmt == "ndjson":
+        encode = json.JSONEncoder(ensure_ascii=False).encode
+        for task in tasks:
+            out.write(encode(dict(zip(RECORD_FIELDS, task_record(task)))) + "\n")
+    else:
+        writer = csv.writer(out, delimiter="\t" if fmt == "tsv" else ",", lineterminator="\n")
+        writer.writerow(RECORD_FIELDS)
+        writer.writerows(
+            ["" if value is None else value for value in task_record(task)] for task in tasks
+        )
+
+
+def parse_due_date(text):
+    """Parse a due date in MM/DD/YYYY format.
+
+    Raises:
+        ValueError: If the date is not in that format
+    """
+    try:
+        return datetime.strptime(text, "%m/%d/%Y").date()
+    except (ValueError, TypeError):
+        raise ValueError("Due date must be in format MM/DD/YYYY")
+
+
+def format_from_path(path):
+    """Guess a record format ("csv", "tsv" or "ndjson") from a file name.
+
+    Raises:
+        ValueError: If the extension is not recognized
+    """
+    extension = os.path.splitext(path)[1].lower()
+    formats = {".csv": "csv", ".tsv": "tsv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+    if extension not in formats:
+        raise ValueError(f"Cannot tell the format of {path}; use a .csv, .tsv, .ndjson or .jsonl file")
+    return formats[extension]
+
+
+def read_records(lines, fmt):
+    """Stream records from CSV, TSV or NDJSON input.
+
+    CSV and TSV input must start with a header row naming the columns.
+    An NDJSON line that is not a JSON object does not stop the stream:
+    a `ValueError` saying why is yielded in place of its record, for the
+    caller to report.
+
+    Args:
+        lines: Iterable of text lines, e.g. an open file
+        fmt (str): "csv", "tsv" or "ndjson"
+
+    Yields:
+        tuple: (line number, dict of field name to value, or ValueError)
+    """
+    import csv
+    import json
+
+    if fmt == "ndjson":
+        for line_number, line in enumerate(lines, 1):
+            if line.strip():
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    record = ValueError(f"Invalid JSON: {e.msg} at column {e.colno}")
+                if not isinstance(record, (dict, ValueError)):
+                    record = ValueError("Record is not a JSON object")
+                yield line_number, record
+    else:
+        reader = csv.DictReader(lines, delimiter="\t" if fmt == "tsv" else ",")
+        for record in reader:
+            yield reader.line_num, record
+
+
+def compile_terms(search_terms):
+    """Build a matcher that tests a name against all search terms at once.
+
+    The terms are compiled into a single case-insensitive alternation, so
+    each name is scanned once however many terms there are, instead of
+    once per term.
+
+    Args:
+        search_terms (list): Terms to match as substrings
+
+    Returns:
+        callable: Takes a name and returns a truthy value if it contains
+            any of the terms
+    """
+    import re
+
+    terms = sorted(set(search_terms), key=len, reverse=True)
+    if not terms:
+        return lambda name: False
+    return re.compile("|".join(map(re.escape, terms)), re.IGNORECASE).search
+
+
+class ChangeSet:
+    """IDs of the tasks created, modified and deleted since the last save.
+
+    Changes to the same task are folded together, so each task is in at
+    most one of the sets: a task created and then modified is only
+    created, and one created and then deleted is in none.
+
+    Attributes:
+                - created - set of IDs of new tasks
+                - modified - set of IDs of existing tasks changed in place
+                - deleted - set of IDs of existing tasks removed
+    """
+
+    def __init__(self):
+        self.created = set()
+        self.modified = set()
+        self.deleted = set()
+
+    def create(self, task_id):
+        if task_id in self.deleted:
+            self.deleted.discard(task_id)
+            self.modified.add(task_id)
+        else:
+            self.created.add(task_id)
+
+    def modify(self, task_id):
+        if task_id not in self.created:
+            self.modified.add(task_id)
+
+    def delete(self, task_id):
+        if task_id in self.created:
+            self.created.discard(task_id)
+        else:
+            self.modified.discard(task_id)
+            self.deleted.add(task_id)
+
+    def __len__(self):
+        return len(self.created) + len(self.modified) + len(self.deleted)
+
+
+@lru_cache(maxsize=None)
+def _numpy():
+    """Return the numpy module, or None if it is not installed.
+
+    NumPy is optional and slow to import, so it is only imported the
+    first time a storage asks for it.
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+class TaskStorage:
+    """Interface between `Tasks` and the place its tasks are kept.
+
+    A storage holds `Task` objects keyed by `unique_id`. `Tasks` calls
+    `load` once, reads through `get`, iteration, `incomplete`, `ordered`
+    and `search`, reports every change through `append`, `update` and
+    `delete`, and calls `flush` with a `ChangeSet` of the tasks changed
+    since the last flush to make those changes durable. Subclasses
+    must implement everything except `incomplete`, `ordered`, `search`,
+    `search_ordered`, `max_id`, `append_many`, `reload` and `compact`,
+    which have generic defaults that an engine can override.
+
+    Attributes:
+                - path - string, file the storage persists to (None if in memory)
+                - sync - bool, whether `flush` waits for its writes to reach the disk
+                - writes_in_place - bool, whether changes reach the files before `flush`
+    """
+
+    path = None
+    sync = True
+    # True if `append`, `update` and `delete` already change the files
+    # other processes read, rather than only `flush` doing so.
+    writes_in_place = False
+
+    def load(self):
+        """Read persisted tasks, if any."""
+        raise NotImplementedError
+
+    def get(self, task_id):
+        """Return the task with the given ID, or None if there is none."""
+        raise NotImplementedError
+
+    def __iter__(self):
+        """Iterate over all tasks in the order they were added."""
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+    def incomplete(self):
+        """Iterate over tasks that have not been completed."""
+        return (task for task in self if task.completed is None)
+
+    def search(self, search_terms):
+        """Iterate over incomplete tasks whose name contains any of the terms.
+
+        Args:
+            search_terms (list): Terms without whitespace, matched
+                case-insensitively as substrings
+        """
+        matches = compile_terms(search_terms)
+        return (task for task in self.incomplete() if matches(task.name))
+
+    def ordered(self, incomplete=False, after=None, limit=None):
+        """Iterate over tasks in display order (see `sort_key`).
+
+        Args:
+            incomplete (bool): If True, only include incomplete tasks
+            after (tuple or None): Only include tasks whose sort key is
+                greater than this one
+            limit (int or None): The caller reads at most this many
+                tasks, so an engine may stop after producing them
+        """
+        tasks = self.incomplete() if incomplete else iter(self)
+        return iter(select_ordered(tasks, after, limit))
+
+    def search_ordered(self, search_terms, after=None, limit=None):
+        """Iterate over the results of `search` in display order.
+
+        Args:
+            search_terms (list): Terms as for `search`
+            after (tuple or None): As for `ordered`
+            limit (int or None): As for `ordered`
+        """
+        return iter(select_ordered(self.search(search_terms), after, limit))
+
+    def max_id(self):
+        """Return the highest task ID in use, or 0 if there are no tasks."""
+        return max((task.unique_id for task in self), default=0)
+
+    def append(self, task):
+        """Add a new task."""
+        raise NotImplementedError
+
+    def append_many(self, tasks):
+        """Add several new tasks at once."""
+        for task in tasks:
+            self.append(task)
+
+    def update(self, task):
+        """Record that an existing task was modified in place."""
+        raise NotImplementedError
+
+    def delete(self, task_id):
+        """Remove the task with the given ID."""
+        raise NotImplementedError
+
+    def reload(self):
+        """Replace the loaded tasks with what is saved now.
+
+        Used to pick up changes saved by other processes.
+        """
+        self.load()
+
+    def flush(self, changes=None):
+        """Persist the changes made since the last flush.
+
+        Args:
+            changes (ChangeSet or None): The tasks changed since the last
+                flush, so a storage can write only those. None if unknown,
+                in which case everything must be written.
+        """
+        raise NotImplementedError
+
+    def compact(self):
+        """Reorganize persisted data to speed up future loads."""
+        self.flush()
+
+
+class WordIndex:
+    """Inverted index from the words of incomplete task names to task IDs.
+
+    Words are the whitespace-separated parts of a name, lowercased. A
+    search term never contains whitespace, so a name contains the term
+    exactly when one of its words does. Searching therefore scans the
+    vocabulary once for words containing any term and unions their
+    posting sets, without reading the tasks themselves.
+
+    Lowercasing only agrees with the case-insensitive matching of
+    `compile_terms` for ASCII text, so names with other characters are
+    not split into words but kept in `unindexed`, and always returned as
+    candidates. Search terms must be ASCII.
+    """
+
+    def __init__(self, tasks=()):
+        self.postings = {}
+        self.unindexed = set()
+        for task in tasks:
+            self.add(task)
+
+    def add(self, task):
+        """Index the words of a task's name, unless it is completed."""
+        if task.completed is not None:
+            return
+        if not task.name.isascii():
+            self.unindexed.add(task.unique_id)
+            return
+        for word in set(task.name.lower().split()):
+            self.postings.setdefault(word, set()).add(task.unique_id)
+
+    def discard(self, task):
+        """Remove a task from the index, if present."""
+        if not task.name.isascii():
+            self.unindexed.discard(task.unique_id)
+            return
+        for word in set(task.name.lower().split()):
+            ids = self.postings.get(word)
+            if ids is not None:
+                ids.discard(task.unique_id)
+                if not ids:
+                    del self.postings[word]
+
+    def update(self, task):
+        """Drop a task from the index once it is completed."""
+        if task.completed is not None:
+            self.discard(task)
+
+    def search(self, search_terms):
+        """Return the IDs of tasks with a word containing any of the terms.
+
+        Also returns the unindexed tasks, which may or may not match.
+        """
+        terms = [term.lower() for term in search_terms]
+        matches = set(self.unindexed)
+        for word, ids in self.postings.items():
+            if any(term in word for term in terms):
+                matches |= ids
+        return matches
+
+
+class TrigramIndex:
+    """Inverted index from the trigrams of incomplete task names to task IDs.
+
+    A name can only contain a term if it contains every three-character
+    slice of it, so intersecting the posting sets of a term's trigrams
+    gives a small candidate set that is then checked for the substring.
+    Terms shorter than three characters have no trigrams and must be
+    answered some other way. As in `WordIndex`, names that are not ASCII
+    are kept in `unindexed` and are always candidates.
+    """
+
+    def __init__(self, tasks=()):
+        self.postings = {}
+        self.unindexed = set()
+        for task in tasks:
+            self.add(task)
+
+    @staticmethod
+    def trigrams(text):
+        """Return the set of three-character slices of `text`."""
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def add(self, task):
+        """Index the trigrams of a task's name, unless it is completed."""
+        if task.completed is not None:
+            return
+        if not task.name.isascii():
+            self.unindexed.add(task.unique_id)
+            return
+        for trigram in self.trigrams(task.name.lower()):
+            self.postings.setdefault(trigram, set()).add(task.unique_id)
+
+    def discard(self, task):
+        """Remove a task from the index, if present."""
+        if not task.name.isascii():
+            self.unindexed.discard(task.unique_id)
+            return
+        for trigram in self.trigrams(task.name.lower()):
+            ids = self.postings.get(trigram)
+            if ids is not None:
+                ids.discard(task.unique_id)
+                if not ids:
+                    del self.postings[trigram]
+
+    def update(self, task):
+        """Drop a task from the index once it is completed."""
+        if task.completed is not None:
+            self.discard(task)
+
+    def candidates(self, term):
+        """Return the IDs of tasks whose name may contain `term`.
+
+        Args:
+            term (str): Lowercased ASCII term of at least three characters
+        """
+        postings = sorted(
+            (self.postings.get(trigram, set()) for trigram in self.trigrams(term)),
+            key=len
+        )
+        return postings[0].intersection(*postings[1:]) | self.unindexed
+
+
+class OrderedIndex:
+    """Task keys kept in `sort_key` order, so listing needs no sort.
+
+    Keys are held in a list of sorted blocks, with the last key of each
+    block in `maxes`. Finding a key's block is a binary search over
+    `maxes`, and inserting or removing it only shifts the entries of one
+    block, which is split once it grows past twice `BLOCK_SIZE`. Each
+    key ends with the task ID, so keys are unique.
+
+    Attributes:
+                - incomplete_only - bool, if True completed tasks are left out
+                - blocks - list of sorted lists of keys
+                - maxes - list of the last key in each block
+    """
+
+    BLOCK_SIZE = 1000
+
+    def __init__(self, tasks=(), incomplete_only=False):
+        self.incomplete_only = incomplete_only
+        keys = sorted(sort_key(task) for task in tasks if self._includes(task))
+        size = self.BLOCK_SIZE
+        self.blocks = [keys[i:i + size] for i in range(0, len(keys), size)]
+        self.maxes = [block[-1] for block in self.blocks]
+
+    def _includes(self, task):
+        return not (self.incomplete_only and task.completed is not None)
+
+    def add(self, task):
+        """Insert a task's key in order."""
+        if not self._includes(task):
+            return
+        key = sort_key(task)
+        if not self.blocks:
+            self.blocks.append([key])
+            self.maxes.append(key)
+            return
+        i = min(bisect.bisect_left(self.maxes, key), len(self.blocks) - 1)
+        block = self.blocks[i]
+        bisect.insort(block, key)
+        self.maxes[i] = block[-1]
+        if len(block) > 2 * self.BLOCK_SIZE:
+            half = len(block) // 2
+            self.blocks[i:i + 1] = [block[:half], block[half:]]
+            self.maxes[i:i + 1] = [block[half - 1], block[-1]]
+
+    def discard(self, task):
+        """Remove a task's key, if present."""
+        key = sort_key(task)
+        i = bisect.bisect_left(self.maxes, key)
+        if i == len(self.blocks):
+            return
+        block = self.blocks[i]
+        j = bisect.bisect_left(block, key)
+        if j < len(block) and block[j] == key:
+            del block[j]
+            if block:
+                self.maxes[i] = block[-1]
+            else:
+                del self.blocks[i]
+                del self.maxes[i]
+
+    def update(self, task):
+        """Drop a completed task if only incomplete tasks are kept."""
+        if not self._includes(task):
+            self.discard(task)
+
+    def __iter__(self):
+        for block in self.blocks:
+            yield from block
+
+    def iter_after(self, key):
+        """Iterate over the keys greater than `key`, in order."""
+        i = bisect.bisect_right(self.maxes, key)
+        if i == len(self.blocks):
+            return
+        block = self.blocks[i]
+        yield from block[bisect.bisect_right(block, key):]
+        for block in self.blocks[i + 1:]:
+            yield from block
+
+    def __len__(self):
+        return sum(len(block) for block in self.blocks)
+
+
+class MemoryStorage(TaskStorage):
+    """Tasks kept in a dict keyed by ID, with no persistence.
+
+    The dict doubles as the ID index: `get` and `delete` are constant
+    time, and since dicts keep insertion order, iteration still yields
+    tasks in the order they were added. Incomplete tasks are also kept
+    in a `WordIndex` for `search`, and all tasks and incomplete tasks
+    each in an `OrderedIndex` for `ordered`. These make up `indexes`.
+    The `TrigramIndex` that `search` uses for longer terms is several
+    times their size, so it is kept apart and only built by the first
+    search that needs it. Useful on its own for tests, and as the base
+    of the file-backed storages that load everything into memory.
+    """
+
+    def __init__(self, tasks=None):
+        self.by_id = {}
+        self.indexes = self._new_indexes()
+        self.trigrams = None
+        for task in tasks or []:
+            self._put(task)
+
+    @staticmethod
+    def _new_indexes(tasks=()):
+        """Build the secondary indexes over `tasks`."""
+        tasks = list(tasks)
+        return {
+            'words': WordIndex(tasks),
+            'order': OrderedIndex(tasks),
+            'open_order': OrderedIndex(tasks, incomplete_only=True),
+        }
+
+    def _all_indexes(self):
+        """Return `indexes` plus the trigram index, if it has been built."""
+        indexes = list(self.indexes.values())
+        if self.trigrams is not None:
+            indexes.append(self.trigrams)
+        return indexes
+
+    def _trigram_index(self):
+        """Return the trigram index, building it on first use."""
+        if self.trigrams is None:
+            self.trigrams = TrigramIndex(self.by_id.values())
+        return self.trigrams
+
+    def _put(self, task):
+        """Insert or replace a task, keeping the indexes current."""
+        indexes = self._all_indexes()
+        old = self.by_id.get(task.unique_id)
+        if old is not None:
+            for index in indexes:
+                index.discard(old)
+        self.by_id[task.unique_id] = task
+        for index in indexes:
+            index.add(task)
+
+    def _remove(self, task_id):
+        """Remove a task if present, keeping the indexes current."""
+        task = self.by_id.pop(task_id, None)
+        if task is not None:
+            for index in self._all_indexes():
+                index.discard(task)
+
+    def load(self):
+        pass
+
+    def get(self, task_id):
+        return self.by_id.get(task_id)
+
+    def __iter__(self):
+        return iter(self.by_id.values())
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def search(self, search_terms):
+        """Iterate over incomplete tasks whose name contains any of the terms.
+
+        Terms of three or more characters are looked up in the trigram
+        index, shorter terms in the word index, and the candidates are
+        confirmed with `compile_terms`. Terms that are not ASCII are
+        matched by a scan, as case-insensitive matching of them does not
+        always agree with lowercasing.
+        """
+        if not all(term.isascii() for term in search_terms):
+            return super().search(search_terms)
+        by_id = self.by_id
+        terms = [term.lower() for term in search_terms]
+        short_terms = [term for term in terms if len(term) < 3]
+        candidates = self.indexes['words'].search(short_terms) if short_terms else set()
+        for term in terms:
+            if len(term) >= 3:
+                candidates |= self._trigram_index().candidates(term)
+        matches = compile_terms(search_terms)
+        # Sorting the IDs keeps ties in insertion order, as a scan would.
+        return (by_id[task_id] for task_id in sorted(candidates) if matches(by_id[task_id].name))
+
+    def ordered(self, incomplete=False, after=None, limit=None):
+        by_id = self.by_id
+        index = self.indexes['open_order' if incomplete else 'order']
+        keys = index if after is None else index.iter_after(after)
+        return (by_id[key[-1]] for key in keys)
+
+    def max_id(self):
+        return max(self.by_id, default=0)
+
+    def append(self, task):
+        self._put(task)
+
+    def update(self, task):
+        for index in self._all_indexes():
+            index.update(task)
+
+    def delete(self, task_id):
+        self._remove(task_id)
+
+    def flush(self, changes=None):
+        pass
+
+
+class PickleStorage(MemoryStorage):
+    """Tasks pickled as a whole into a single file.
+
+    Every flush rewrites the entire file. The file holds the ID index
+    and `indexes` themselves, so loading does not need to rebuild them;
+    files written before an index existed, or with an older
+    `INDEX_VERSION`, are reindexed on load. The trigram index is not
+    saved, and is rebuilt by the first search that needs it. On first
+    use at the default path, tasks from the journal storage's snapshot
+    and journal are imported.
+    """
+
+    TASKS_FILE = os.path.join(HOME, ".tasks.pickle")
+    # Bumped whenever the layout of the saved indexes changes.
+    INDEX_VERSION = 2
+
+    def __init__(self, path=None):
+        super().__init__()
+        self.path = path or self.TASKS_FILE
+        self.generation = 0
+
+    def load(self):
+        """Load tasks from the pickle file if it exists."""
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'rb') as f:
+                    loaded_data = pickle.load(f)
+                    tasks = loaded_data.get('tasks', {})
+                    if isinstance(tasks, list):
+                        tasks = {task.unique_id: task for task in tasks}
+                    self.by_id = tasks
+                    indexes = loaded_data.get('indexes')
+                    if (indexes is None or indexes.keys() != self._new_indexes().keys()
+                            or loaded_data.get('index_version', 1) != self.INDEX_VERSION):
+                        indexes = self._new_indexes(tasks.values())
+                    self.indexes = indexes
+                    self.trigrams = None
+                    self.generation = loaded_data.get('generation', 0)
+            except (pickle.PickleError, IOError) as e:
+                print(f"Warning: Could not load tasks from {self.path}: {e}")
+                self.by_id = {}
+                self.indexes = self._new_indexes()
+                self.trigrams = None
+        else:
+            self._import_journal()
+
+    def _import_journal(self):
+        """Copy in the tasks of the default journal storage, if any."""
+        journal = _journal_to_import(self, self.TASKS_FILE)
+        if journal is not None:
+            self.by_id = journal.by_id
+            self.indexes = journal.indexes
+            self.trigrams = None
+
+    def reload(self):
+        self.__init__(self.path)
+        self.load()
+
+    def flush(self, changes=None):
+        """Pickle the whole task list to the file, unless nothing changed."""
+        if changes is not None and not changes:
+            return
+        self._write_snapshot(self.generation)
+
+    def _write_snapshot(self, generation):
+        """Atomically replace the pickle file with the current tasks."""
+        _replace_file(self.path, {
+            'tasks': self.by_id,
+            'indexes': self.indexes,
+            'index_version': self.INDEX_VERSION,
+            'generation': generation,
+        }, self.sync)
+
+
+class JournalStorage(PickleStorage):
+    """A pickle snapshot plus an append-only journal of changes.
+
+    Each change is queued as a small record and `flush` appends the
+    queued records to the journal, so saving costs the same no matter
+    how many tasks are stored. `load` reads the snapshot and replays the
+    journal on top of it.
+    """
+
+    TASKS_FILE = os.path.join(HOME, ".tasks.pkl")
+    JOURNAL_FILE = os.path.join(HOME, ".tasks.journal")
+    # The journal is folded into the snapshot once it holds at least this
+    # many records and at least as many records as there are tasks, which
+    # keeps the amortized cost of compaction constant per mutation.
+    COMPACT_THRESHOLD = 1000
+
+    def __init__(self, path=None, journal_path=None):
+        super().__init__(path)
+        self.journal_path = journal_path or self.JOURNAL_FILE
+        self._journal_end = 0
+        self._journal_records = 0
+
+    def load(self):
+        """Load the snapshot and replay the journal on top."""
+        super().load()
+        self._replay_journal()
+
+    def reload(self):
+        self.__init__(self.path, self.journal_path)
+        self.load()
+
+    def _import_journal(self):
+        """Nothing to import: the journal is this storage's own."""
+
+    def _replay_journal(self):
+        """Apply the journal records written since the snapshot.
+
+        The journal starts with a ('checkpoint', generation) record naming
+        the snapshot it extends, followed by pickled tuples appended by
+        `flush`: ('add', task), ('update', task) or ('delete', task_id).
+        A journal from an older generation has already been folded into the
+        snapshot and is skipped. A torn record at the end of the file (e.g.
+        from a crash mid-append) stops the replay; the next flush truncates
+        it away.
+        """
+        if not os.path.exists(self.journal_path):
+            return
+        try:
+            with open(self.journal_path, 'rb') as f:
+                while True:
+                    try:
+                        record = pickle.load(f)
+                    except EOFError:
+                        break
+                    except (pickle.UnpicklingError, ValueError, AttributeError) as e:
+                        print(f"Warning: Ignoring truncated journal record in {self.journal_path}: {e}")
+                        break
+                    if record[0] == 'checkpoint':
+                        if record[1] < self.generation:
+                            return
+                    else:
+                        self._apply_record(record)
+                        self._journal_records += 1
+                    self._journal_end = f.tell()
+        except IOError as e:
+            print(f"Warning: Could not read journal {self.journal_path}: {e}")
+
+    def _apply_record(self, record):
+        """Apply one journal record to the loaded tasks.
+
+        Args:
+            record (tuple): Journal record as written by `flush`
+        """
+        op = record[0]
+        if op in ('add', 'update'):
+            self._put(record[1])
+        elif op == 'done':
+            # ('done', task_id, completed) records are no longer written,
+            # but journals saved before changes were recorded as whole
+            # tasks may still hold them.
+            task = self.by_id.get(record[1])
+            if task is not None:
+                task.completed = record[2]
+                MemoryStorage.update(self, task)
+        elif op == 'delete':
+            self._remove(record[1])
+
+    def flush(self, changes=None):
+        """Append the changes made since the last flush to the journal.
+
+        Each changed task gets one record with its current state, however
+        many times it changed. Without `changes` there is no telling what
+        changed, so the journal is compacted instead, and once it outgrows
+        `COMPACT_THRESHOLD` it is compacted as well.
+        """
+        if changes is None:
+            self.compact()
+            return
+        if not changes:
+            return
+        records = (
+            [('add', self.by_id[task_id]) for task_id in sorted(changes.created)]
+            + [('update', self.by_id[task_id]) for task_id in sorted(changes.modified)]
+            + [('delete', task_id) for task_id in sorted(changes.deleted)]
+        )
+        is_new = not os.path.exists(self.journal_path)
+        with open(self.journal_path, 'ab') as f:
+            if f.tell() > self._journal_end:
+                f.truncate(self._journal_end)
+            if self._journal_end == 0:
+                pickle.dump(('checkpoint', self.generation), f, pickle.HIGHEST_PROTOCOL)
+            for record in records:
+                pickle.dump(record, f, pickle.HIGHEST_PROTOCOL)
+            self._journal_end = f.tell()
+            if self.sync:
+                f.flush()
+                os.fsync(f.fileno())
+        if is_new and self.sync:
+            _fsync_directory(self.journal_path)
+        self._journal_records += len(records)
+        if self._journal_records >= max(self.COMPACT_THRESHOLD, len(self.by_id)):
+            self.compact()
+
+    def compact(self):
+        """Fold the journal into a fresh snapshot.
+
+        The snapshot is written to a temporary file and renamed over the
+        pickle file, then the journal is replaced by one that only holds
+        the new checkpoint. If the process dies between the two renames,
+        the old journal still names the previous generation and is skipped
+        on the next load, so no change is applied twice.
+        """
+        generation = self.generation + 1
+        self._write_snapshot(generation)
+        self.generation = generation
+        _replace_file(self.journal_path, ('checkpoint', generation), self.sync)
+        self._journal_end = os.path.getsize(self.journal_path)
+        self._journal_records = 0
+
+
+def _journal_to_import(storage, default_path):
+    """Return the loaded default journal storage for a new `storage` to import.
+
+    Only a storage opened at its own default path imports the user's
+    tasks; one opened at an explicit path (e.g. by a benchmark) starts
+    empty.
+
+    Args:
+        storage (TaskStorage): The new storage
+        default_path (str): The storage class's default file
+
+    Returns:
+        JournalStorage or None: None if there is nothing to import
+    """
+    if storage.path != default_path:
+        return None
+    journal = JournalStorage()
+    if not (os.path.exists(journal.path) or os.path.exists(journal.journal_path)):
+        return None
+    journal.load()
+    return journal
+
+
+class SQLiteStorage(TaskStorage):
+    """Tasks stored in a SQLite database.
+
+    Tasks are never loaded as a whole: lookups run against indexed
+    columns and only build `Task` objects for the rows they read.
+    Searches for ASCII terms filter names in SQL with `LIKE` as well,
+    and confirm the rows they read with `compile_terms`. On first use at the default
+    path, tasks from the pickle snapshot and journal are imported.
+    """
+
+    DB_FILE = os.path.join(HOME, ".tasks.db")
+    writes_in_place = True
+    COLUMNS = "unique_id, name, priority, due_date, created, completed"
+    DISPLAY_ORDER = "due_date IS NULL, due_date, priority DESC, unique_id"
+
+    def __init__(self, path=None):
+        self.path = path or self.DB_FILE
+        self.conn = None
+
+    def load(self):
+        """Open the database, creating and populating it if it is new."""
+        import sqlite3
+
+        is_new = not os.path.exists(self.path)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                unique_id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                priority INTEGER NOT NULL,
+                due_date TEXT,
+                created TEXT NOT NULL,
+                completed TEXT
+            );
+            CREATE INDEX IF NOT EXISTS tasks_completed ON tasks (completed);
+            CREATE INDEX IF NOT EXISTS tasks_due_date ON tasks (due_date);
+            CREATE INDEX IF NOT EXISTS tasks_priority ON tasks (priority);
+        """)
+        self.conn.execute(f"PRAGMA synchronous = {'FULL' if self.sync else 'OFF'}")
+        if is_new:
+            self._import_journal()
+
+    def reload(self):
+        """Nothing to do: every read queries the database as it is now."""
+
+    def _import_journal(self):
+        """Copy tasks from the pickle snapshot and journal into the database."""
+        journal = _journal_to_import(self, self.DB_FILE)
+        if journal is None:
+            return
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT INTO tasks ({self.COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+                (task_record(task) for task in journal)
+            )
+
+    def _row_to_task(self, row):
+        """Build a `Task` from a row without consuming a new ID."""
+        task = Task.__new__(Task)
+        task.unique_id, task.name, task.priority, due, created, completed = row
+        task.due_date = date.fromisoformat(due) if due else None
+        task.created = datetime.fromisoformat(created)
+        task.completed = datetime.fromisoformat(completed) if completed else None
+        return task
+
+    def _select(self, where="", params=(), order_by="unique_id"):
+        """Yield tasks for the rows matching an optional WHERE clause."""
+        rows = self.conn.execute(
+            f"SELECT {self.COLUMNS} FROM tasks {where} ORDER BY {order_by}", params
+        )
+        return (self._row_to_task(row) for row in rows)
+
+    def get(self, task_id):
+        return next(self._select("WHERE unique_id = ?", (task_id,)), None)
+
+    def __iter__(self):
+        return self._select()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    def incomplete(self):
+        return self._select("WHERE completed IS NULL")
+
+    def _after(self, after, conditions, params):
+        """Add the condition for rows whose sort key is greater than `after`."""
+        no_due, due_ordinal, neg_priority, task_id = after
+        conditions.append(
+            "(due_date IS NULL, COALESCE(due_date, ''), -priority, unique_id) > (?, ?, ?, ?)"
+        )
+        due = "" if no_due else date.fromordinal(due_ordinal).isoformat()
+        params += [int(no_due), due, neg_priority, task_id]
+
+    def ordered(self, incomplete=False, after=None, limit=None):
+        conditions = []
+        params = []
+        if incomplete:
+            conditions.append("completed IS NULL")
+        if after is not None:
+            self._after(after, conditions, params)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        order_by = self.DISPLAY_ORDER
+        if limit is not None:
+            order_by += f" LIMIT {int(limit)}"
+        return self._select(where, params, order_by)
+
+    @staticmethod
+    def _like_pattern(term):
+        """Return a `LIKE` pattern matching names that contain `term`."""
+        for char in "\\%_":
+            term = term.replace(char, "\\" + char)
+        return f"%{term}%"
+
+    def _search(self, search_terms, after=None, order_by="unique_id"):
+        """Select incomplete tasks matching any of the ASCII terms.
+
+        Rows are narrowed in SQL with `LIKE`, and the tasks built from
+        them are confirmed with `compile_terms`. `LIKE` only ignores the
+        case of ASCII letters, so names with any other character (whose
+        length in bytes differs from their length in characters) are
+        always read and left to `compile_terms` to match.
+        """
+        patterns = sorted({self._like_pattern(term) for term in search_terms})
+        conditions = ["completed IS NULL"]
+        params = []
+        if after is not None:
+            self._after(after, conditions, params)
+        name_matches = ["name LIKE ? ESCAPE '\\'"] * len(patterns)
+        name_matches.append("length(CAST(name AS BLOB)) != length(name)")
+        conditions.append(f"({' OR '.join(name_matches)})")
+        params += patterns
+        matches = compile_terms(search_terms)
+        tasks = self._select(f"WHERE {' AND '.join(conditions)}", params, order_by)
+        return (task for task in tasks if matches(task.name))
+
+    def search(self, search_terms):
+        if not all(term.isascii() for term in search_terms):
+            return super().search(search_terms)
+        return self._search(search_terms)
+
+    def search_ordered(self, search_terms, after=None, limit=None):
+        if not all(term.isascii() for term in search_terms):
+            return super().search_ordered(search_terms, after, limit)
+        return self._search(search_terms, after, self.DISPLAY_ORDER)
+
+    def max_id(self):
+        return self.conn.execute("SELECT MAX(unique_id) FROM tasks").fetchone()[0] or 0
+
+    def append(self, task):
+        self.conn.execute(
+            f"INSERT INTO tasks ({self.COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+            task_record(task)
+        )
+
+    def append_many(self, tasks):
+        self.conn.executemany(
+            f"INSERT INTO tasks ({self.COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+            (task_record(task) for task in tasks)
+        )
+
+    def update(self, task):
+        row = task_record(task)
+        self.conn.execute(
+            "UPDATE tasks SET name = ?, priority = ?, due_date = ?, created = ?, completed = ? "
+            "WHERE unique_id = ?",
+            row[1:] + row[:1]
+        )
+
+    def delete(self, task_id):
+        self.conn.execute("DELETE FROM tasks WHERE unique_id = ?", (task_id,))
+
+    def flush(self, changes=None):
+        """Commit the changes made since the last flush."""
+        self.conn.commit()
+
+    def compact(self):
+        """Commit pending changes and reclaim space left by deleted rows."""
+        self.conn.commit()
+        self.conn.execute("VACUUM")
+
+
+class ColumnarStorage(TaskStorage):
+    """Tasks kept column by column in typed arrays, pickled to a file.
+
+    Each attribute lives in its own `array.array`, one row per task: IDs,
+    priorities, due dates as ordinals (0 for none), and created and
+    completed times as microseconds since the epoch (`NO_TIME` if not
+    completed), plus a display rank per row (see `_rank`). Names are
+    interned in a string pool that rows refer to by position. Rows are
+    kept in ID order, so `get` is a binary search.
+
+    Filters run over whole columns with `map` and `compress`, which loop
+    in C rather than reading attributes task by task, sorts order row
+    numbers by rank, and `Task` objects are only built for the rows that
+    are returned. Loading unpickles a few arrays instead of one object
+    per task. On first use at the default path, tasks from the pickle
+    snapshot and journal are imported.
+
+    With at least `VECTORIZE_MIN_TASKS` tasks and NumPy installed,
+    `ordered` and `search_ordered` filter and sort with NumPy instead;
+    both paths return tasks in the same order.
+    """
+
+    COLUMNS_FILE = os.path.join(HOME, ".tasks.cols")
+    COLUMNS = ("ids", "priorities", "due", "created", "completed", "name_refs", "ranks")
+    TYPECODES = ("q", "b", "i", "q", "q", "i", "i")
+    NO_TIME = -1 << 63
+    NO_DUE = date.max.toordinal() + 1
+    # Below this many tasks, importing NumPy costs more than it saves.
+    VECTORIZE_MIN_TASKS = 100000
+    EPOCH = datetime(1970, 1, 1)
+
+    def __init__(self, path=None):
+        self.path = path or self.COLUMNS_FILE
+        self._reset()
+
+    def _reset(self):
+        """Start with no tasks."""
+        for name, typecode in zip(self.COLUMNS, self.TYPECODES):
+            setattr(self, name, array(typecode))
+        self.names = []
+        self.name_pool = {}
+
+    def _columns(self):
+        return [getattr(self, name) for name in self.COLUMNS]
+
+    def load(self):
+        """Load the columns from the file, or import them if it is new."""
+        if not os.path.exists(self.path):
+            self._import_journal()
+            return
+        try:
+            with open(self.path, 'rb') as f:
+                loaded_data = pickle.load(f)
+            for name in self.COLUMNS:
+                setattr(self, name, loaded_data[name])
+            self.names = loaded_data['names']
+            self.name_pool = {name: ref for ref, name in enumerate(self.names)}
+        except (pickle.PickleError, IOError, KeyError) as e:
+            print(f"Warning: Could not load tasks from {self.path}: {e}")
+            self._reset()
+
+    def reload(self):
+        self._reset()
+        self.load()
+
+    def _import_journal(self):
+        """Copy tasks from the pickle snapshot and journal into the columns."""
+        journal = _journal_to_import(self, self.COLUMNS_FILE)
+        if journal is not None:
+            self.append_many(journal)
+
+    def _micros(self, moment):
+        if moment is None:
+            return self.NO_TIME
+        return (moment - self.EPOCH) // timedelta(microseconds=1)
+
+    def _intern(self, name):
+        """Return the position of a name in the string pool, adding it if new."""
+        ref = self.name_pool.get(name)
+        if ref is None:
+            ref = self.name_pool[name] = len(self.names)
+            self.names.append(name)
+        return ref
+
+    def _rank(self, due_ordinal, priority):
+        """Return an int that orders rows like `sort_key`, bar ties.
+
+        The due ordinal (`NO_DUE` if none) times 256 minus the priority,
+        which fits a signed byte. Rows are kept in ID order, so a stable
+        sort on the rank breaks ties by ID, as `sort_key` does.
+        """
+        return (due_ordinal or self.NO_DUE) * 256 - priority
+
+    def _row_values(self, task):
+        """Return a task's values in `COLUMNS` order."""
+        due = task.due_date.toordinal() if task.due_date is not None else 0
+        return (task.unique_id, task.priority, due, self._micros(task.created),
+                self._micros(task.completed), self._intern(task.name), self._rank(due, task.priority))
+
+    def _row(self, task_id):
+        """Return the row holding a task ID, or None if there is none."""
+        row = bisect.bisect_left(self.ids, task_id)
+        if row < len(self.ids) and self.ids[row] == task_id:
+            return row
+        return None
+
+    def _tasks(self, rows):
+        """Build a `Task` for each row without consuming new IDs."""
+        ids, names, name_refs, priorities = self.ids, self.names, self.name_refs, self.priorities
+        due, created, completed = self.due, self.created, self.completed
+        no_time, epoch, micros = self.NO_TIME, self.EPOCH, timedelta(microseconds=1)
+        new = Task.__new__
+        for row in rows:
+            task = new(Task)
+            task.unique_id = ids[row]
+            task.name = names[name_refs[row]]
+            task.priority = priorities[row]
+            ordinal = due[row]
+            task.due_date = date.fromordinal(ordinal) if ordinal else None
+            task.created = epoch + created[row] * micros
+            finished = completed[row]
+            task.completed = None if finished == no_time else epoch + finished * micros
+            yield task
+
+    def _open_mask(self):
+        """Iterate over one flag per row, True where the task is incomplete."""
+        return map(self.NO_TIME.__eq__, self.completed)
+
+    def get(self, task_id):
+        row = self._row(task_id)
+        return None if row is None else next(self._tasks((row,)))
+
+    def __iter__(self):
+        return self._tasks(range(len(self.ids)))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def incomplete(self):
+        return self._tasks(compress(range(len(self.ids)), self._open_mask()))
+
+    def _matching_refs(self, search_terms):
+        """Return the pool positions of names containing any of the terms."""
+        names = self.names
+        return set(compress(range(len(names)), map(compile_terms(search_terms), names)))
+
+    def _search_rows(self, refs):
+        """Iterate over the rows of incomplete tasks whose name is in `refs`."""
+        hits = map(operator.and_, self._open_mask(), map(refs.__contains__, self.name_refs))
+        return compress(range(len(self.ids)), hits)
+
+    def search(self, search_terms):
+        """Iterate over incomplete tasks whose name contains any of the terms.
+
+        Each distinct name in the pool is matched once; rows are then
+        selected by whether their name reference is one of the matches.
+        """
+        return self._tasks(self._search_rows(self._matching_refs(search_terms)))
+
+    def search_ordered(self, search_terms, after=None, limit=None):
+        refs = self._matching_refs(search_terms)
+        np = self._vectorized()
+        if np is not None:
+            name_refs = np.array(self.name_refs)
+            mask = np.isin(name_refs, np.fromiter(refs, name_refs.dtype, len(refs)))
+            mask &= np.array(self.completed) == self.NO_TIME
+            return self._tasks(self._vector_order(np, mask, after, limit))
+        return self._tasks(self._order(self._search_rows(refs), after, limit))
+
+    def ordered(self, incomplete=False, after=None, limit=None):
+        np = self._vectorized()
+        if np is not None:
+            if incomplete:
+                mask = np.array(self.completed) == self.NO_TIME
+            else:
+                mask = np.ones(len(self.ids), dtype=bool)
+            return self._tasks(self._vector_order(np, mask, after, limit))
+        rows = range(len(self.ids))
+        if incomplete:
+            rows = compress(rows, self._open_mask())
+        return self._tasks(self._order(rows, after, limit))
+
+    def _order(self, rows, after=None, limit=None):
+        """Return `rows` in display order, sorted by their rank."""
+        ranks = self.ranks
+        if after is not None:
+            no_due, due_ordinal, neg_priority, task_id = after
+            after_rank = self._rank(0 if no_due else due_ordinal, -neg_priority)
+            ids = self.ids
+            rows = [row for row in rows
+                    if ranks[row] > after_rank or (ranks[row] == after_rank and ids[row] > task_id)]
+        if limit is None:
+            return sorted(rows, key=ranks.__getitem__)
+        return heapq.nsmallest(limit, rows, key=ranks.__getitem__)
+
+    def _vectorized(self):
+        """Return numpy if it is installed and there are enough tasks to use it."""
+        if len(self.ids) < self.VECTORIZE_MIN_TASKS:
+            return None
+        return _numpy()
+
+    def _vector_order(self, np, mask, after=None, limit=None):
+        """Return the rows selected by a boolean mask in display order.
+
+        The columns are copied into NumPy arrays holding the parts of
+        `sort_key`; the cursor is compared against them part by part,
+        and `lexsort` orders the rows by them, last part first. With a
+        limit, only rows ranked no later than the limit-th are sorted.
+
+        Args:
+            np: The numpy module
+            mask: Boolean array with one flag per row
+            after (tuple or None): As for `ordered`
+            limit (int or None): As for `ordered`
+
+        Returns:
+            list: Row numbers
+        """
+        due = np.array(self.due)
+        keys = [due == 0, due, -np.array(self.priorities, dtype=np.int16), np.array(self.ids)]
+        if after is not None:
+            later = keys[-1] > after[-1]
+            for column, value in zip(keys[-2::-1], after[-2::-1]):
+                later = (column > value) | ((column == value) & later)
+            mask &= later
+        rows = np.flatnonzero(mask)
+        if limit is not None and 0 < limit < len(rows):
+            ranks = np.array(self.ranks)[rows]
+            rows = rows[ranks <= np.partition(ranks, limit - 1)[limit - 1]]
+        rows = rows[np.lexsort([column[rows] for column in reversed(keys)])]
+        return rows[:limit].tolist()
+
+    def max_id(self):
+        return self.ids[-1] if self.ids else 0
+
+    def append(self, task):
+        values = self._row_values(task)
+        row = len(self.ids)
+        if row and task.unique_id <= self.ids[-1]:
+            row = bisect.bisect_left(self.ids, task.unique_id)
+        for column, value in zip(self._columns(), values):
+            column.insert(row, value)
+
+    def update(self, task):
+        row = self._row(task.unique_id)
+        if row is not None:
+            for column, value in zip(self._columns(), self._row_values(task)):
+                column[row] = value
+
+    def delete(self, task_id):
+        row = self._row(task_id)
+        if row is not None:
+            for column in self._columns():
+                del column[row]
+
+    def flush(self, changes=None):
+        """Pickle all the columns and the string pool to the file.
+
+        Nothing is written if `changes` is empty.
+        """
+        if changes is not None and not changes:
+            return
+        data = {name: getattr(self, name) for name in self.COLUMNS}
+        data['names'] = self.names
+        _replace_file(self.path, data, self.sync)
+
+    def compact(self):
+        """Drop names no task refers to any more from the pool, then flush."""
+        names = self.names
+        self.names = []
+        self.name_pool = {}
+        self.name_refs = array(self.name_refs.typecode, (self._intern(names[ref]) for ref in self.name_refs))
+        self.flush()
+
+
+class MmapStorage(TaskStorage):
+    """Tasks stored as fixed-width binary records in a memory-mapped file.
+
+    The record of task N is slot N - 1 of the records file, after a
+    small header, so `get`, `update` and `delete` read or write one
+    record in place, and opening the file reads only the header rather
+    than deserializing every task. A deleted task leaves a tombstone: its
+    slot's ID is set to 0. Names are appended to a separate heap file
+    that records point into by offset and length. Times are microseconds
+    since the epoch and due dates ordinals, as in `ColumnarStorage`.
+    Listing and searching still read every record. On first use at the
+    default path, tasks from the pickle snapshot and journal are imported.
+    """
+
+    RECORDS_FILE = os.path.join(HOME, ".tasks.bin")
+    NAMES_FILE = os.path.join(HOME, ".tasks.names")
+    MAGIC = b"TASKBIN1"
+    # Magic, number of slots in use (the highest ID stored), live tasks.
+    HEADER = struct.Struct("<8sQQ")
+    # ID, created, completed, name offset, name length, due ordinal, priority.
+    RECORD = struct.Struct("<qqqQIib7x")
+    INITIAL_SLOTS = 1024
+    writes_in_place = True
+    NO_TIME = ColumnarStorage.NO_TIME
+    EPOCH = ColumnarStorage.EPOCH
+    _micros = ColumnarStorage._micros
+
+    def __init__(self, path=None, names_path=None):
+        self.path = path or self.RECORDS_FILE
+        self.names_path = names_path or self.NAMES_FILE
+        self.records = None
+        self.slots = 0
+        self.live = 0
+
+    def load(self):
+        """Map the records file, creating and populating it if it is new."""
+        import mmap
+
+        is_new = not os.path.exists(self.path)
+        if is_new:
+            with open(self.path, 'wb') as f:
+                f.write(self.HEADER.pack(self.MAGIC, 0, 0))
+                f.truncate(self._position(self.INITIAL_SLOTS + 1))
+        self._file = open(self.path, 'r+b')
+        self._map = lambda: mmap.mmap(self._file.fileno(), 0)
+        self.records = self._map()
+        magic, self.slots, self.live = self.HEADER.unpack_from(self.records)
+        if magic != self.MAGIC:
+            raise ValueError(f"{self.path} is not a task records file")
+        self.names = open(self.names_path, 'a+b')
+        self.names_end = self.names.seek(0, os.SEEK_END)
+        if is_new:
+            if self.sync:
+                _fsync_directory(self.path)
+            self._import_journal()
+
+    def reload(self):
+        """Map the files again, as other processes may have grown them."""
+        self.records.close()
+        self._file.close()
+        self.names.close()
+        self.load()
+
+    def _import_journal(self):
+        """Copy tasks from the pickle snapshot and journal into the records."""
+        journal = _journal_to_import(self, self.RECORDS_FILE)
+        if journal is not None:
+            self.append_many(journal)
+            self.flush()
+
+    def _position(self, task_id):
+        """Return the byte offset of a task's record."""
+        return self.HEADER.size + (task_id - 1) * self.RECORD.size
+
+    def _record(self, task_id):
+        """Return the record of a live task, or None if there is none."""
+        if not 1 <= task_id <= self.slots:
+            return None
+        record = self.RECORD.unpack_from(self.records, self._position(task_id))
+        return record if record[0] == task_id else None
+
+    def _write_record(self, task, name_offset, name_length):
+        due = task.due_date.toordinal() if task.due_date is not None else 0
+        self.RECORD.pack_into(
+            self.records, self._position(task.unique_id), task.unique_id,
+            self._micros(task.created), self._micros(task.completed),
+            name_offset, name_length, due, task.priority
+        )
+
+    def _write_header(self):
+        self.HEADER.pack_into(self.records, 0, self.MAGIC, self.slots, self.live)
+
+    def _write_name(self, name):
+        """Append a name to the heap and return its (offset, length)."""
+        data = name.encode("utf-8", "surrogatepass")
+        offset = self.names_end
+        self.names.write(data)
+        self.names_end += len(data)
+        return offset, len(data)
+
+    def _heap(self, offset=0, length=None):
+        """Read part of the name heap, by default all of it."""
+        self.names.flush()
+        if length is None:
+            length = self.names_end - offset
+        return os.pread(self.names.fileno(), length, offset)
+
+    def _task(self, record, name):
+        """Build a `Task` from a record without consuming a new ID."""
+        task_id, created, completed, _, _, due, priority = record
+        task = Task.__new__(Task)
+        task.unique_id = task_id
+        task.name = name.decode("utf-8", "surrogatepass")
+        task.priority = priority
+        task.due_date = date.fromordinal(due) if due else None
+        task.created = self.EPOCH + timedelta(microseconds=created)
+        task.completed = None if completed == self.NO_TIME else self.EPOCH + timedelta(microseconds=completed)
+        return task
+
+    def _grow(self, slots):
+        """Extend the file so it has room for at least `slots` records."""
+        capacity = (len(self.records) - self.HEADER.size) // self.RECORD.size
+        if slots <= capacity:
+            return
+        self.records.close()
+        self._file.truncate(self._position(max(slots, 2 * capacity) + 1))
+        self.records = self._map()
+
+    def get(self, task_id):
+        record = self._record(task_id)
+        if record is None:
+            return None
+        return self._task(record, self._heap(record[3], record[4]))
+
+    def __iter__(self):
+        heap = self._heap()
+        data = self.records[self.HEADER.size:self._position(self.slots + 1)]
+        for record in self.RECORD.iter_unpack(data):
+            if record[0]:
+                offset = record[3]
+                yield self._task(record, heap[offset:offset + record[4]])
+
+    def __len__(self):
+        return self.live
+
+    def max_id(self):
+        task_id = self.slots
+        while task_id and self._record(task_id) is None:
+            task_id -= 1
+        return task_id
+
+    def append(self, task):
+        task_id = task.unique_id
+        self._grow(task_id)
+        if self._record(task_id) is None:
+            self.live += 1
+        self._write_record(task, *self._write_name(task.name))
+        self.slots = max(self.slots, task_id)
+        self._write_header()
+
+    def update(self, task):
+        record = self._record(task.unique_id)
+        if record is None:
+            return
+        name_offset, name_length = record[3:5]
+        if self._heap(name_offset, name_length) != task.name.encode("utf-8", "surrogatepass"):
+            name_offset, name_length = self._write_name(task.name)
+        self._write_record(task, name_offset, name_length)
+
+    def delete(self, task_id):
+        if self._record(task_id) is not None:
+            struct.pack_into("<q", self.records, self._position(task_id), 0)
+            self.live -= 1
+            self._write_header()
+
+    def flush(self, changes=None):
+        """Write new names to disk, then the changed pages of the records file.
+
+        The records file is mapped shared, so without `sync` its changes
+        are already in the page cache and only the names need writing.
+        """
+        self.names.flush()
+        if self.sync:
+            os.fsync(self.names.fileno())
+            self.records.flush()
+
+    def compact(self):
+        """Flush, and release the space reserved past the highest slot in use.
+
+        Records cannot move, since their slot is derived from the ID, and
+        the names of deleted tasks stay in the heap.
+        """
+        self.flush()
+        self.records.close()
+        self._file.truncate(self._position(max(self.slots, 1) + 1))
+        self.records = self._map()
+
+
+STORAGE_BACKENDS = {
+    'journal': JournalStorage,
+    'pickle': PickleStorage,
+    'sqlite': SQLiteStorage,
+    'columnar': ColumnarStorage,
+    'mmap': MmapStorage,
+    'memory': MemoryStorage,
+}
+
+
+def open_storage(backend=None):
+    """Create the storage for the configured backend.
+
+    Args:
+        backend (str or None): One of the names in `STORAGE_BACKENDS`;
+            defaults to the TASKS_BACKEND environment variable, or
+            "journal" if unset
+
+    Returns:
+        TaskStorage: The (not yet loaded) storage
+
+    Raises:
+        ValueError: If the backend name is unknown
     """
+    backend = backend or os.environ.get("TASKS_BACKEND", "journal")
+    if backend not in STORAGE_BACKENDS:
+        raise ValueError(f"Unknown storage backend: {backend}")
+    return STORAGE_BACKENDS[backend]()
 
-    _id_counter = 1
 
-    def __init__(self, name, priority=1, due=None):
-        self.created = datetime.now()
-        self.completed = None
-        self.name = name
-        self.unique_id = Task._id_counter
-        Task._id_counter += 1
-        self.priority = priority
-        self.due_date = due
+DURABILITY_LEVELS = ("none", "batch", "op")
 
-    def mark_complete(self):
-        """Mark the task as completed with current date/time"""
-        self.completed = datetime.now()
 
-    @classmethod
-    def set_id_counter(cls, value):
-        """Set the ID counter to a specific value.
-        
+def durability_level(level=None):
+    """Return the configured durability level.
+
+    - none: files are still replaced atomically, but nothing waits for
+      the disk, so a power failure can lose recent saves
+    - batch: every save waits until its writes are on disk
+    - op: as batch, and every change is saved as soon as it is made,
+      even in the middle of a --batch
+
+    Args:
+        level (str or None): One of `DURABILITY_LEVELS`; defaults to the
+            TASKS_DURABILITY environment variable, or "batch" if unset
+
+    Raises:
+        ValueError: If the level is unknown
+    """
+    level = level or os.environ.get("TASKS_DURABILITY", "batch")
+    if level not in DURABILITY_LEVELS:
+        raise ValueError(f"Unknown durability level: {level}")
+    return level
+
+
+CONCURRENCY_MODES = ("lock", "optimistic", "none")
+
+
+def concurrency_mode(mode=None):
+    """Return the configured way of sharing tasks with other processes.
+
+    - lock: a change takes the storage's lock, first catching up with
+      anything other processes saved, and holds it until it is saved
+    - optimistic: the lock is only taken to save; if another process
+      saved since the tasks were loaded, they are reloaded and the
+      unsaved changes reapplied before saving
+    - none: no coordination; concurrent saves can lose changes
+
+    Storages whose files change before a save (`writes_in_place`) are
+    always used as in "lock" mode, since a change written over another
+    process's cannot be reapplied.
+
+    Args:
+        mode (str or None): One of `CONCURRENCY_MODES`; defaults to the
+            TASKS_CONCURRENCY environment variable, or "lock" if unset
+
+    Raises:
+        ValueError: If the mode is unknown
+    """
+    mode = mode or os.environ.get("TASKS_CONCURRENCY", "lock")
+    if mode not in CONCURRENCY_MODES:
+        raise ValueError(f"Unknown concurrency mode: {mode}")
+    return mode
+
+
+class StoreLock:
+    """Advisory lock and version stamp for a storage shared by processes.
+
+    The lock is an `fcntl.flock` on a file next to the storage's file,
+    taken exclusively to change and save tasks and shared to load them.
+    The file also holds a version number that every save bumps, so a
+    process can tell whether anyone saved since it loaded.
+
+    Attributes:
+                - path - string, the lock file
+                - held - bool, whether this process holds the lock
+                  exclusively
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.held = False
+        self._fd = None
+        self._writable = False
+
+    def acquire(self, shared=False):
+        """Wait for and take the lock.
+
         Args:
-            value (int): The new ID counter value
-            
+            shared (bool): If True, take the lock shared with other
+                readers; the lock file may then be read-only
+
         Raises:
-            ValueError: If value is not a positive integer
+            OSError: If the lock file cannot be opened
         """
-        if not isinstance(value, int) or value < 1:
-            raise ValueError("ID must be a positive integer")
-        cls._id_counter = value
+        import fcntl
 
-    def __repr__(self):
-        return (f"Task(id={self.unique_id}, name='{self.name}', priority={self.priority}, "
-                f"created={self.created}, due={self.due_date}, completed={self.completed})")
+        if self._fd is None or (not shared and not self._writable):
+            self._open(shared)
+        fcntl.flock(self._fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        self.held = not shared
+
+    def _open(self, shared):
+        """Open the lock file, read-only if it cannot be written and `shared`."""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        try:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            self._writable = True
+        except PermissionError:
+            if not shared:
+                raise
+            self._fd = os.open(self.path, os.O_RDONLY)
+            self._writable = False
+
+    def release(self):
+        import fcntl
+
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self.held = False
+
+    def version(self):
+        """Return the version stamp; only meaningful while holding the lock."""
+        return int.from_bytes(os.pread(self._fd, 8, 0), "little")
+
+    def bump(self):
+        """Increment the version stamp after a save, and return it."""
+        version = self.version() + 1
+        os.pwrite(self._fd, version.to_bytes(8, "little"), 0)
+        return version
+
+
+def _fsync_directory(path):
+    """Make the creation or renaming of `path` durable."""
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _remove_quietly(path):
+    """Remove `path` if it exists, e.g. a temporary file after a failure."""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _replace_file(path, data, sync=True):
+    """Atomically replace `path` with a pickle of `data`.
+
+    The pickle is written to a temporary file that is then renamed over
+    `path`, so a crash leaves either the old file or the new one.
+
+    Args:
+        path (str): Destination file
+        data: Object to pickle
+        sync (bool): If True, fsync the file before the rename and the
+            directory after it, so the new file survives a power failure
+    """
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(data, f, pickle.HIGHEST_PROTOCOL)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        _remove_quietly(tmp_path)
+        raise
+    if sync:
+        _fsync_directory(path)
 
-    def __str__(self):
-        status = "Completed" if self.completed else "Incomplete"
-        due_str = f", Due: {self.due_date}" if self.due_date else ""
-        return f"[{self.unique_id}] {self.name} (Priority: {self.priority}) - {status}{due_str}"
 
 class Tasks:
-    """A list of `Task` objects."""
-    
-    TASKS_FILE = os.path.join(Path.home(), ".tasks.pkl")
-    
-    def __init__(self):
-        self.tasks = []
+    """A list of `Task` objects, kept in a `TaskStorage`."""
+
+    RENDER_CHUNK_ROWS = 4096
+    IMPORT_CHUNK_SIZE = 10000
+    EXPORT_BUFFER_SIZE = 1 << 20
+
+    def __init__(self, storage=None, durability=None, concurrency=None):
+        self.storage = storage if storage is not None else open_storage()
+        self.durability = durability_level(durability)
+        self.storage.sync = self.durability != "none"
+        self.concurrency = concurrency_mode(concurrency)
+        self.lock = None
+        if self.concurrency != "none" and self.storage.path is not None:
+            self.lock = StoreLock(f"{self.storage.path}.lock")
+        self.changes = ChangeSet()
+        # Unsaved changes as (method, args, result), to reapply after a
+        # reload. Task IDs in them are the ones first given to the caller.
+        self._ops = []
+        # IDs of unsaved new tasks that were renumbered by a reload.
+        self._renumbered = {}
+        self._version = 0
         self._load_tasks()
-    
+
+    @property
+    def tasks(self):
+        """List of all tasks in the storage."""
+        return list(self.storage)
+
     def _load_tasks(self):
-        """Load tasks from pickle file if it exists."""
-        if os.path.exists(self.TASKS_FILE):
+        """Load tasks from storage and continue numbering after them.
+
+        The lock is taken shared, so loading waits for a save in progress
+        but not for other readers. Storages that write in place may create
+        and fill their files on first load, so they take it exclusively if
+        they can. A store whose lock file cannot be opened, e.g. a
+        read-only one, is loaded without it.
+        """
+        if not self._lock_for_reading(exclusive=self.storage.writes_in_place):
+            self.storage.load()
+        else:
             try:
-                with open(self.TASKS_FILE, 'rb') as f:
-                    loaded_data = pickle.load(f)
-                    self.tasks = loaded_data.get('tasks', [])
-                    if self.tasks:
-                        max_id = max(task.unique_id for task in self.tasks)
-                        Task.set_id_counter(max_id + 1)
-            except (pickle.PickleError, IOError) as e:
-                print(f"Warning: Could not load tasks from {self.TASKS_FILE}: {e}")
-                self.tasks = []
+                self.storage.load()
+                self._version = self.lock.version()
+            finally:
+                self.lock.release()
+        Task.set_id_counter(self.storage.max_id() + 1)
+
+    def _lock_for_reading(self, exclusive=False):
+        """Take the lock to read the storage, if there is one to take.
+
+        Args:
+            exclusive (bool): Take the lock exclusively if the lock file
+                can be written, instead of shared
+
+        Returns:
+            bool: True if the caller must release the lock
+        """
+        if self.lock is None or self.lock.held:
+            return False
+        try:
+            self.lock.acquire(shared=not exclusive)
+        except OSError:
+            if not exclusive:
+                return False
+            return self._lock_for_reading()
+        return True
+
+    def refresh(self):
+        """Catch up with changes other processes saved since the last load.
+
+        Only possible with a lock, whose version stamp tells whether
+        anyone saved; without one, nothing is reloaded. Unsaved changes
+        are caught up with when they are saved instead (see `_acquire`).
+        """
+        if self.changes or not self._lock_for_reading():
+            return
+        try:
+            if self.lock.version() != self._version:
+                self.storage.reload()
+                self._version = self.lock.version()
+                Task.set_id_counter(self.storage.max_id() + 1)
+        finally:
+            self.lock.release()
+
+    def unlock(self):
+        """Let other processes in between commands, e.g. while waiting for input.
+
+        Unsaved changes are kept and reapplied if another process saves
+        first (see `_acquire`). Storages that write changes in place
+        cannot reapply them, so their changes are saved first.
+        """
+        if self.lock is None or not self.lock.held:
+            return
+        if self.changes and self.storage.writes_in_place:
+            self._flush()
+        else:
+            self.lock.release()
 
     def pickle_tasks(self):
-        """Pickle your task list to a file"""
+        """Save the changes made since the last save to storage."""
+        try:
+            self._flush()
+            print(f"Tasks saved to {self.storage.path}")
+        except IOError as e:
+            print(f"Error: Could not save tasks to {self.storage.path}: {e}")
+
+    def compact(self):
+        """Reorganize the storage so future loads are faster."""
         try:
-            data = {'tasks': self.tasks}
-            with open(self.TASKS_FILE, 'wb') as f:
-                pickle.dump(data, f)
-            print(f"Tasks saved to {self.TASKS_FILE}")
+            if self.lock is not None:
+                self._acquire()
+            self.storage.compact()
+            self.changes = ChangeSet()
+            self._ops = []
+            self._renumbered = {}
+            if self.lock is not None:
+                self._version = self.lock.bump()
+            print(f"Compacted {len(self.storage)} tasks into {self.storage.path}")
         except IOError as e:
-            print(f"Error: Could not save tasks to {self.TASKS_FILE}: {e}")
+            print(f"Error: Could not compact tasks into {self.storage.path}: {e}")
+        finally:
+            self._release()
+
+    def _flush(self):
+        """Have the storage persist `changes`, then start a new change set.
+
+        With a lock, saving holds it, catches up with saves made by other
+        processes first (see `_acquire`), and bumps the version stamp.
+        """
+        if self.lock is None:
+            self.storage.flush(self.changes)
+            self.changes = ChangeSet()
+            return
+        self._acquire()
+        try:
+            self.storage.flush(self.changes)
+            if self.changes:
+                self._version = self.lock.bump()
+            self.changes = ChangeSet()
+            self._ops = []
+            self._renumbered = {}
+        finally:
+            self.lock.release()
+
+    def _acquire(self):
+        """Take the lock, reapplying unsaved changes if others saved since."""
+        if self.lock.held:
+            return
+        self.lock.acquire()
+        if self.lock.version() != self._version:
+            self._reapply()
+
+    def _release(self):
+        """Release the lock, unless it must be held until changes are saved."""
+        if self.lock is not None and self.lock.held and not self.changes:
+            self.lock.release()
+
+    def _reapply(self):
+        """Reload the tasks and redo the changes not saved yet.
+
+        New tasks get the next free IDs after the reload, which may differ
+        from the IDs `add` returned. Later changes to those tasks follow
+        them to their new IDs, and each new ID is reported.
+        """
+        ops = self._ops
+        self.storage.reload()
+        self._version = self.lock.version()
+        Task.set_id_counter(self.storage.max_id() + 1)
+        self.changes = ChangeSet()
+        self._renumbered = {}
+        if ops:
+            print(f"Warning: Tasks were changed by another process; reapplying {len(ops)} change(s)")
+        for op, args, result in ops:
+            try:
+                new_result = getattr(self, f"_{op}")(*self._current_ids(op, args))
+            except ValueError as e:
+                print(f"Warning: Could not reapply {op}: {e}")
+                continue
+            if op == "add" and new_result != result:
+                self._renumbered[result] = new_result
+                print(f"Warning: Task {self._format_id(result)} is now task {self._format_id(new_result)}")
+
+    def _current_ids(self, op, args):
+        """Return `args` with the ID of a renumbered new task replaced."""
+        if op in ("done", "delete") and args and args[0] in self._renumbered:
+            return (self._renumbered[args[0]],) + args[1:]
+        return args
+
+    def _change(self, op, *args):
+        """Make a change with the method `_<op>`, in step with other processes.
+
+        In "lock" mode the lock is taken first and kept until the change
+        is saved. The change is recorded so it can be reapplied if the
+        tasks have to be reloaded before saving.
+        """
+        if self.lock is not None and (self.concurrency == "lock" or self.storage.writes_in_place):
+            self._acquire()
+        try:
+            result = getattr(self, f"_{op}")(*self._current_ids(op, args))
+        finally:
+            self._release()
+        if self.lock is not None:
+            self._ops.append((op, args, result))
+        self._changed()
+        return result
+
+    def _changed(self):
+        """Save right away if the durability level calls for it."""
+        if self.durability == "op":
+            self._flush()
 
     def _format_id(self, task_id):
         """Format task ID as 4-digit string with leading zeros.
@@ -109,91 +2116,177 @@ class Tasks:
         """
         return f"{task_id:04d}"
 
-    def _sort_tasks(self, tasks):
-        """Sort tasks by due date and priority.
-        
-        Sorting rules:
-        - Tasks with due dates come first, sorted by due date
-        - Tasks without due dates come last
-        - Within each group, sort by decreasing priority (3, 2, 1)
-        
+    def _fetch_size(self, limit, offset):
+        """Return how many ordered tasks a page needs, or None for all.
+
+        Raises:
+            ValueError: If limit or offset are out of range
+        """
+        if limit is not None and (not isinstance(limit, int) or limit < 1):
+            raise ValueError("Limit must be a positive integer")
+        if not isinstance(offset, int) or offset < 0:
+            raise ValueError("Offset must be a non-negative integer")
+        return None if limit is None else offset + limit + 1
+
+    def _page(self, tasks, limit=None, offset=0):
+        """Take one page from an iterator of tasks in display order.
+
+        Without a limit the page is streamed from `tasks`; with one it is
+        read up front, one task past the end to tell if more remain.
+
         Args:
-            tasks: List of Task objects to sort
-            
+            tasks: Iterator of Task objects in display order
+            limit (int or None): Maximum number of tasks on the page
+            offset (int): Number of tasks to skip first
+
         Returns:
-            Sorted list of Task objects
-        """
-        return sorted(
-            tasks,
-            key=lambda t: (
-                t.due_date is None,
-                t.due_date if t.due_date is not None else None,
-                -t.priority
-            )
-        )
+            tuple: (iterator over the tasks on the page, cursor for the
+                next page or None if this is the last page)
+        """
+        if limit is None:
+            return islice(tasks, offset, None), None
+        page = list(islice(tasks, offset, offset + limit + 1))
+        if len(page) > limit:
+            del page[limit:]
+            return iter(page), encode_cursor(page[-1])
+        return iter(page), None
+
+    def _show(self, tasks, limit, offset, fmt, report=False, empty_message="No tasks found."):
+        """Output one page of tasks in the requested format.
+
+        Args:
+            tasks: Iterator of Task objects in display order
+            limit (int or None): Maximum number of tasks to show
+            offset (int): Number of tasks to skip first
+            fmt (str): One of `OUTPUT_FORMATS`
+            report (bool): If True, use the report table layout
+            empty_message (str): Printed instead of an empty table
+        """
+        page, next_cursor = self._page(tasks, limit, offset)
+        if fmt == "table":
+            first = next(page, None)
+            if first is None:
+                print(empty_message)
+                return
+            self._display_tasks(chain([first], page), report)
+            if next_cursor is not None:
+                print(f"More tasks available: use --cursor {next_cursor}")
+        else:
+            write_records(page, fmt, sys.stdout)
+            if next_cursor is not None:
+                print(f"More tasks available: use --cursor {next_cursor}", file=sys.stderr)
 
     def _display_tasks(self, tasks, report=False):
         """Display a list of tasks in formatted table.
+
+        Rows are formatted into a buffer and written to stdout in chunks
+        of `RENDER_CHUNK_ROWS`, rather than printed one at a time, and the
+        current date used for task ages is read once per table.
         
         Args:
-            tasks: List of Task objects to display
+            tasks: Iterable of Task objects to display
             report: If True, show report format with created/completed dates;
                    if False, show standard list format (default: False)
         """
-        if not tasks:
+        tasks = iter(tasks)
+        first = next(tasks, None)
+        if first is None:
             print("No tasks found.")
             return
-        
+
         if report:
-            print(f"{'ID':<5} {'Age':<5} {'Due Date':<11} {'Priority':<10} {'Task':<20} {'Created':<30} {'Completed'}")
-            print("-" * 120)
-            
-            for task in tasks:
-                task_id = self._format_id(task.unique_id)
-                age = (datetime.now().date() - task.created.date()).days
-                age_str = f"{age}d"
-                due_date_str = task.due_date.strftime("%m/%d/%Y") if task.due_date else "-"
-                priority = task.priority
-                name = task.name[:17] + ".." if len(task.name) > 19 else task.name
-                created_str = task.created.strftime("%a %b %d %H:%M:%S %Z %Y")
-                completed_str = task.completed.strftime("%a %b %d %H:%M:%S %Z %Y") if task.completed else "-"
-                
-                print(f"{task_id:<5} {age_str:<5} {due_date_str:<11} {priority:<10} {name:<20} {created_str:<30} {completed_str}")
+            header = f"{'ID':<5} {'Age':<5} {'Due Date':<11} {'Priority':<10} {'Task':<20} {'Created':<30} {'Completed'}"
+            lines = [header, "-" * 120]
+            format_row = self._format_report_row
         else:
-            print(f"{'ID':<5} {'Age':<5} {'Due Date':<11} {'Priority':<10} {'Task'}")
-            print("-" * 70)
-            
-            for task in tasks:
-                task_id = self._format_id(task.unique_id)
-                age = (datetime.now().date() - task.created.date()).days
-                age_str = f"{age}d"
-                due_date_str = task.due_date.strftime("%m/%d/%Y") if task.due_date else "-"
-                priority = task.priority
-                name = task.name
-                print(f"{task_id:<5} {age_str:<5} {due_date_str:<11} {priority:<10} {name}")
-
-    def list(self):
-        """Display a list of incomplete tasks sorted by due date and priority."""
-        incomplete_tasks = [task for task in self.tasks if task.completed is None]
-        if not incomplete_tasks:
-            print("No incomplete tasks.")
-            return
-        sorted_tasks = self._sort_tasks(incomplete_tasks)
+            header = f"{'ID':<5} {'Age':<5} {'Due Date':<11} {'Priority':<10} {'Task'}"
+            lines = [header, "-" * 70]
+            format_row = self._format_list_row
+
+        out = sys.stdout
+        today = datetime.now().date()
+        lines.append(format_row(first, today))
+        for task in tasks:
+            lines.append(format_row(task, today))
+            if len(lines) >= self.RENDER_CHUNK_ROWS:
+                lines.append("")
+                out.write("\n".join(lines))
+                lines = []
+        lines.append("")
+        out.write("\n".join(lines))
+
+    def _format_list_row(self, task, today):
+        """Format one row of the standard list table.
+
+        Args:
+            task (Task): The task to format
+            today (date): Current date, for the task's age
+
+        Returns:
+            str: The row, without a trailing newline
+        """
+        task_id = self._format_id(task.unique_id)
+        age = (today - task.created.date()).days
+        age_str = f"{age}d"
+        due_date_str = format_due_date(task.due_date) if task.due_date else "-"
+        priority = task.priority
+        name = task.name
+        return f"{task_id:<5} {age_str:<5} {due_date_str:<11} {priority:<10} {name}"
 
-        self._display_tasks(sorted_tasks)
+    def _format_report_row(self, task, today):
+        """Format one row of the report table.
+
+        Args:
+            task (Task): The task to format
+            today (date): Current date, for the task's age
+
+        Returns:
+            str: The row, without a trailing newline
+        """
+        task_id = self._format_id(task.unique_id)
+        age = (today - task.created.date()).days
+        age_str = f"{age}d"
+        due_date_str = format_due_date(task.due_date) if task.due_date else "-"
+        priority = task.priority
+        name = task.name[:17] + ".." if len(task.name) > 19 else task.name
+        created_str = format_timestamp(task.created)
+        completed_str = format_timestamp(task.completed) if task.completed else "-"
+        return f"{task_id:<5} {age_str:<5} {due_date_str:<11} {priority:<10} {name:<20} {created_str:<30} {completed_str}"
+
+    def list(self, limit=None, offset=0, cursor=None, fmt="table"):
+        """Display a list of incomplete tasks sorted by due date and priority.
+
+        Args:
+            limit (int or None): Show at most this many tasks
+            offset (int): Skip this many tasks first
+            cursor (str or None): Start after the task a previous page
+                ended on
+            fmt (str): One of `OUTPUT_FORMATS` (default: "table")
+        """
+        check_format(fmt)
+        after = decode_cursor(cursor) if cursor else None
+        tasks = self.storage.ordered(
+            incomplete=True, after=after, limit=self._fetch_size(limit, offset)
+        )
+        self._show(tasks, limit, offset, fmt, empty_message="No incomplete tasks.")
 
-    def report(self):
+    def report(self, limit=None, offset=0, cursor=None, fmt="table"):
         """Display a report of all tasks (completed and incomplete).
         
         Follows the same sorting order as --list command.
         Shows created and completed dates for each task.
+
+        Args:
+            limit (int or None): Show at most this many tasks
+            offset (int): Skip this many tasks first
+            cursor (str or None): Start after the task a previous page
+                ended on
+            fmt (str): One of `OUTPUT_FORMATS` (default: "table")
         """
-        if not self.tasks:
-            print("No tasks found.")
-            return
-        
-        sorted_tasks = self._sort_tasks(self.tasks)
-        self._display_tasks(sorted_tasks, report=True)
+        check_format(fmt)
+        after = decode_cursor(cursor) if cursor else None
+        tasks = self.storage.ordered(after=after, limit=self._fetch_size(limit, offset))
+        self._show(tasks, limit, offset, fmt, report=True)
 
     def delete(self, task_id):
         """Delete a task by its unique ID.
@@ -204,16 +2297,19 @@ class Tasks:
         Raises:
             ValueError: If task ID is not found or is invalid
         """
+        self._change("delete", task_id)
+
+    def _delete(self, task_id):
+        """Delete a task; see `delete`."""
         if not isinstance(task_id, int):
             raise ValueError("Task ID must be an integer")
 
-        for i, task in enumerate(self.tasks):
-            if task.unique_id == task_id:
-                self.tasks.pop(i)
-                formatted_id = self._format_id(task_id)
-                print(f"Deleted task {formatted_id}")
-                return
-        raise ValueError(f"Task ID {task_id} not found")
+        if self.storage.get(task_id) is None:
+            raise ValueError(f"Task ID {task_id} not found")
+        self.storage.delete(task_id)
+        self.changes.delete(task_id)
+        formatted_id = self._format_id(task_id)
+        print(f"Deleted task {formatted_id}")
 
     def done(self, task_id):
         """Mark a task as complete by its unique ID.
@@ -224,37 +2320,189 @@ class Tasks:
         Raises:
             ValueError: If task ID is not found or is invalid
         """
+        self._change("done", task_id)
+
+    def _done(self, task_id):
+        """Mark a task complete; see `done`."""
         if not isinstance(task_id, int):
             raise ValueError("Task ID must be an integer")
 
-        for task in self.tasks:
-            if task.unique_id == task_id:
-                task.mark_complete()
-                formatted_id = self._format_id(task_id)
-                print(f"Completed task {formatted_id}")
-                return
-        raise ValueError(f"Task ID {task_id} not found")
+        task = self.storage.get(task_id)
+        if task is None:
+            raise ValueError(f"Task ID {task_id} not found")
+        task.mark_complete()
+        self.storage.update(task)
+        self.changes.modify(task_id)
+        formatted_id = self._format_id(task_id)
+        print(f"Completed task {formatted_id}")
 
-    def query(self, search_terms):
+    def query(self, search_terms, limit=None, offset=0, cursor=None, fmt="table"):
         """Search for tasks matching any of the search terms (case-insensitive).
         
         Args:
             search_terms: String of search terms separated by spaces
             Only incomplete tasks are returned.
+            limit (int or None): Show at most this many tasks
+            offset (int): Skip this many tasks first
+            cursor (str or None): Start after the task a previous page
+                ended on
+            fmt (str): One of `OUTPUT_FORMATS` (default: "table")
         """
+        check_format(fmt)
         search_terms = search_terms.split()
 
-        incomplete_tasks = [task for task in self.tasks if task.completed is None]
-        matching_tasks = []
-        for task in incomplete_tasks:
-            for term in search_terms:
-                if re.search(re.escape(term), task.name, re.IGNORECASE):
-                    matching_tasks.append(task)
-                    break
-
-        sorted_tasks = self._sort_tasks(matching_tasks)
+        after = decode_cursor(cursor) if cursor else None
+        sorted_tasks = self.storage.search_ordered(search_terms, after, self._fetch_size(limit, offset))
         
-        self._display_tasks(sorted_tasks)
+        self._show(sorted_tasks, limit, offset, fmt)
+
+    def import_tasks(self, path, fmt=None, chunk_size=None):
+        """Add tasks from a CSV, TSV or NDJSON file.
+
+        The file is read as a stream. Each record has a "name" and
+        optionally a "priority" and a "due" date in MM/DD/YYYY format,
+        validated as for `add`; invalid records are reported and
+        skipped. Files written by `export_tasks` can be imported too,
+        as new tasks: their ISO "due_date" is used when there is no
+        "due", but their "id", "created" and "completed" fields are
+        ignored. Valid tasks are saved in chunks of `chunk_size`, each
+        added to storage in one call, and progress is reported on stderr
+        after each chunk.
+
+        Args:
+            path (str): File to read
+            fmt (str or None): "csv", "tsv" or "ndjson"; guessed from the
+                file extension if None
+            chunk_size (int or None): Tasks per save (default:
+                `IMPORT_CHUNK_SIZE`)
+
+        Returns:
+            tuple: (number of tasks imported, number of records skipped)
+
+        Raises:
+            ValueError: If the format is unknown or the file is malformed
+        """
+        try:
+            return self._import_tasks(path, fmt, chunk_size)
+        finally:
+            self._release()
+
+    def _import_tasks(self, path, fmt, chunk_size):
+        """Import tasks; see `import_tasks`."""
+        fmt = fmt or format_from_path(path)
+        chunk_size = chunk_size or self.IMPORT_CHUNK_SIZE
+        imported = skipped = 0
+        chunk = []
+        start = time.perf_counter()
+        with open(path, newline="", encoding="utf-8") as f:
+            for line_number, record in read_records(f, fmt):
+                if not chunk and self.lock is not None:
+                    # New tasks take the next free IDs, so the lock is held
+                    # from the first task of a chunk until it is saved.
+                    self._acquire()
+                try:
+                    if isinstance(record, ValueError):
+                        raise record
+                    priority = record.get("priority") or 1
+                    due = record.get("due") or None
+                    if due is None and record.get("due_date"):
+                        due = date.fromisoformat(record["due_date"]).strftime("%m/%d/%Y")
+                    chunk.append(self._new_task(
+                        record.get("name"),
+                        int(priority) if isinstance(priority, str) else priority,
+                        due
+                    ))
+                except (ValueError, TypeError) as e:
+                    skipped += 1
+                    print(f"Warning: Skipping line {line_number} of {path}: {e}", file=sys.stderr)
+                    continue
+                if len(chunk) >= chunk_size:
+                    imported += self._save_chunk(chunk)
+                    chunk = []
+                    rate = imported / (time.perf_counter() - start)
+                    print(f"Imported {imported} tasks ({rate:,.0f} tasks/s)", file=sys.stderr)
+        if chunk:
+            imported += self._save_chunk(chunk)
+        print(f"Imported {imported} tasks from {path}, skipped {skipped}")
+        return imported, skipped
+
+    def export_tasks(self, path, fmt=None, status="all", due_from=None, due_to=None):
+        """Write tasks to a CSV, TSV or NDJSON file.
+
+        Tasks are read from storage one at a time, in the order they were
+        added, and written as they are read, so memory use does not grow
+        with the number of tasks exported. The file is written under a
+        temporary name and renamed into place when complete.
+
+        Args:
+            path (str): File to write, or "-" for stdout
+            fmt (str or None): "csv", "tsv" or "ndjson"; guessed from the
+                file extension if None
+            status (str): "all", "completed" or "incomplete"
+            due_from (str or None): Only export tasks due on or after this
+                MM/DD/YYYY date
+            due_to (str or None): Only export tasks due on or before this
+                MM/DD/YYYY date
+
+        Returns:
+            int: Number of tasks exported
+
+        Raises:
+            ValueError: If the format, status or a date is invalid
+        """
+        fmt = fmt or format_from_path(path)
+        check_format(fmt)
+        if fmt == "table":
+            raise ValueError("Export format must be csv, tsv or ndjson")
+        if status not in ("all", "completed", "incomplete"):
+            raise ValueError("Status must be all, completed or incomplete")
+        first_due = parse_due_date(due_from) if due_from else None
+        last_due = parse_due_date(due_to) if due_to else None
+
+        tasks = self.storage.incomplete() if status == "incomplete" else iter(self.storage)
+        if status == "completed":
+            tasks = (task for task in tasks if task.completed is not None)
+        if first_due or last_due:
+            tasks = (
+                task for task in tasks
+                if task.due_date is not None
+                and (first_due is None or task.due_date >= first_due)
+                and (last_due is None or task.due_date <= last_due)
+            )
+        exported = 0
+
+        def counted(tasks):
+            nonlocal exported
+            for task in tasks:
+                exported += 1
+                yield task
+
+        if path == "-":
+            write_records(counted(tasks), fmt, sys.stdout)
+            print(f"Exported {exported} tasks", file=sys.stderr)
+            return exported
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w", newline="", encoding="utf-8", buffering=self.EXPORT_BUFFER_SIZE) as f:
+                write_records(counted(tasks), fmt, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            _remove_quietly(tmp_path)
+            raise
+        print(f"Exported {exported} tasks to {path}")
+        return exported
+
+    def _save_chunk(self, chunk):
+        """Add a chunk of new tasks to storage and save them.
+
+        Returns:
+            int: Number of tasks saved
+        """
+        self.storage.append_many(chunk)
+        for task in chunk:
+            self.changes.create(task.unique_id)
+        self._flush()
+        return len(chunk)
 
     def add(self, name, priority=1, due=None):
         """Add a new task to the task list.
@@ -267,23 +2515,40 @@ class Tasks:
         Returns:
             int: The unique ID of the newly created task
             
+        Raises:
+            ValueError: If data validation fails
+        """
+        return self._change("add", name, priority, due)
+
+    def _add(self, name, priority=1, due=None):
+        """Add a task and return its ID; see `add`."""
+        new_task = self._new_task(name, priority, due)
+        self.storage.append(new_task)
+        self.changes.create(new_task.unique_id)
+        task_id = new_task.unique_id
+        formatted_id = self._format_id(task_id)
+        print(f"Created Task {formatted_id}")
+        return task_id
+
+    def _new_task(self, name, priority=1, due=None):
+        """Validate task fields and build a new `Task`.
+
+        Args:
+            name (str): The task description
+            priority (int): Priority level (1, 2, or 3; default is 1)
+            due (str or None): Optional due date in format MM/DD/YYYY
+
+        Returns:
+            Task: The new task, with the next unique ID assigned
+
         Raises:
             ValueError: If data validation fails
         """
         if not isinstance(name, str) or not name.strip():
             raise ValueError("Task name must be a non-empty string")
 
-        if not isinstance(priority, int) or priority not in [1, 2, 3]:
+        if not isinstance(priority, int) or isinstance(priority, bool) or priority not in [1, 2, 3]:
             raise ValueError("Priority must be an integer value of 1, 2, or 3")
-        parsed_due = None
-        if due is not None:
-            try:
-                parsed_due = datetime.strptime(due, "%m/%d/%Y").date()
-            except (ValueError, TypeError):
-                raise ValueError("Due date must be in format MM/DD/YYYY")
-        
-        new_task = Task(name.strip(), priority, parsed_due)
-        self.tasks.append(new_task)
-        task_id = new_task.unique_id
-        formatted_id = self._format_id(task_id)
-        print(f"Created Task {formatted_id}")
\ No newline at end of file
+        parsed_due = parse_due_date(due) if due is not None else None
+
+        return Task(name.strip(), priority, parsed_due)
@@ -0,0 +1,490 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the task manager. Every benchmark builds its tasks in
+memory, so none of them read or write ~/.tasks.pkl.
+
+Run one with, for example:
+
+    python benchmarks.py query-terms --tasks 20000
+"""
+
+import argparse
+import contextlib
+import csv
+import os
+import pickle
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+from Task import (
+    CONCURRENCY_MODES, DURABILITY_LEVELS, ColumnarStorage, JournalStorage, MemoryStorage, MmapStorage, PickleStorage,
+    SQLiteStorage, Task, TaskStorage, Tasks, compile_terms
+)
+
+WORDS = (
+    "buy eggs milk bread walk dog call mom pay rent fix bike email boss "
+    "book flight clean kitchen water plants renew passport file taxes "
+    "review report plan trip study exam write essay"
+).split()
+
+
+def make_tasks(count, seed=0):
+    """Build `count` random incomplete tasks with realistic short names.
+
+    About two thirds of the tasks are due on one of a few dozen dates.
+
+    Args:
+        count (int): Number of tasks to build
+        seed (int): Seed for the random generator, for repeatable runs
+
+    Returns:
+        list: The new Task objects
+    """
+    rng = random.Random(seed)
+    due_dates = [date(2026, 1, 1) + timedelta(days=day) for day in range(60)] + [None] * 30
+    return [
+        Task(" ".join(rng.choices(WORDS, k=rng.randint(2, 5))), rng.randint(1, 3), rng.choice(due_dates))
+        for _ in range(count)
+    ]
+
+
+def make_terms(count, seed=0):
+    """Build `count` distinct search terms, most of which match nothing."""
+    rng = random.Random(seed)
+    terms = set(rng.sample(WORDS, min(3, count)))
+    while len(terms) < count:
+        terms.add("".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=rng.randint(4, 8))))
+    return sorted(terms)
+
+
+def timed(func):
+    """Call `func` and return (result, seconds taken)."""
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def bench_query_terms(args):
+    """Compare the per-term regex loop with a single compiled matcher."""
+    tasks = make_tasks(args.tasks)
+
+    def nested_loop(terms):
+        matching_tasks = []
+        for task in tasks:
+            for term in terms:
+                if re.search(re.escape(term), task.name, re.IGNORECASE):
+                    matching_tasks.append(task)
+                    break
+        return matching_tasks
+
+    def single_pass(terms):
+        matches = compile_terms(terms)
+        return [task for task in tasks if matches(task.name)]
+
+    print(f"{'Terms':<7} {'Nested (tasks/s)':>18} {'Single pass (tasks/s)':>22} {'Speedup':>8}")
+    for count in (1, 10, 50, 100, 200, 500):
+        terms = make_terms(count)
+        expected, nested_time = timed(lambda: nested_loop(terms))
+        result, single_time = timed(lambda: single_pass(terms))
+        assert result == expected
+        print(f"{count:<7} {len(tasks) / nested_time:>18,.0f} {len(tasks) / single_time:>22,.0f} "
+              f"{nested_time / single_time:>7.1f}x")
+
+
+def print_rows(tasks, report=False):
+    """The original renderer: one print() and one datetime.now() per row."""
+    if report:
+        print(f"{'ID':<5} {'Age':<5} {'Due Date':<11} {'Priority':<10} {'Task':<20} {'Created':<30} {'Completed'}")
+        print("-" * 120)
+        for task in tasks:
+            task_id = f"{task.unique_id:04d}"
+            age = (datetime.now().date() - task.created.date()).days
+            age_str = f"{age}d"
+            due_date_str = task.due_date.strftime("%m/%d/%Y") if task.due_date else "-"
+            priority = task.priority
+            name = task.name[:17] + ".." if len(task.name) > 19 else task.name
+            created_str = task.created.strftime("%a %b %d %H:%M:%S %Z %Y")
+            completed_str = task.completed.strftime("%a %b %d %H:%M:%S %Z %Y") if task.completed else "-"
+            print(f"{task_id:<5} {age_str:<5} {due_date_str:<11} {priority:<10} {name:<20} {created_str:<30} {completed_str}")
+    else:
+        print(f"{'ID':<5} {'Age':<5} {'Due Date':<11} {'Priority':<10} {'Task'}")
+        print("-" * 70)
+        for task in tasks:
+            task_id = f"{task.unique_id:04d}"
+            age = (datetime.now().date() - task.created.date()).days
+            age_str = f"{age}d"
+            due_date_str = task.due_date.strftime("%m/%d/%Y") if task.due_date else "-"
+            priority = task.priority
+            name = task.name
+            print(f"{task_id:<5} {age_str:<5} {due_date_str:<11} {priority:<10} {name}")
+
+
+def bench_render(args):
+    """Compare per-row printing with the buffered, cached table renderer."""
+    tasks = make_tasks(args.tasks)
+    for task in tasks[::3]:
+        task.mark_complete()
+    renderer = Tasks(MemoryStorage())
+
+    print(f"{'Layout':<8} {'Per-row print (rows/s)':>24} {'Buffered (rows/s)':>19} {'Speedup':>8}")
+    for report in (False, True):
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            _, old_time = timed(lambda: print_rows(tasks, report))
+            _, new_time = timed(lambda: renderer._display_tasks(tasks, report))
+        layout = "report" if report else "list"
+        print(f"{layout:<8} {len(tasks) / old_time:>24,.0f} {len(tasks) / new_time:>19,.0f} "
+              f"{old_time / new_time:>7.1f}x")
+
+
+def bench_import(args):
+    """Measure --import throughput per storage backend.
+
+    For comparison, the first rows are also added one at a time with a
+    save after each, as separate --add calls would.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "tasks.csv")
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["name", "priority", "due"])
+            for task in make_tasks(args.tasks):
+                due = task.due_date.strftime("%m/%d/%Y") if task.due_date else ""
+                writer.writerow([task.name, task.priority, due])
+
+        storages = {
+            "memory": lambda: MemoryStorage(),
+            "journal": lambda: JournalStorage(os.path.join(tmp, "t.pkl"), os.path.join(tmp, "t.journal")),
+            "sqlite": lambda: SQLiteStorage(os.path.join(tmp, "t.db")),
+        }
+        print(f"{'Backend':<9} {'--import (tasks/s)':>19} {'One --add per task (tasks/s)':>29}")
+        for name, make_storage in storages.items():
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), \
+                    contextlib.redirect_stderr(devnull):
+                tasks = Tasks(make_storage())
+                _, import_time = timed(lambda: tasks.import_tasks(path))
+                single = min(args.tasks, 2000)
+
+                def add_one_by_one():
+                    for task in make_tasks(single):
+                        tasks.add(task.name, task.priority)
+                        tasks.pickle_tasks()
+                _, single_time = timed(add_one_by_one)
+            print(f"{name:<9} {args.tasks / import_time:>19,.0f} {single / single_time:>29,.0f}")
+
+
+def bench_columnar(args):
+    """Compare per-task scans with the columnar storage's batched filters.
+
+    Each command loads the tasks from a file and then runs one storage
+    call, as a separate `task_manager.py` run would. The scans are
+    `TaskStorage`'s generic methods over pickled `Task` objects, which
+    is how `--list`, `--report` and `--query` worked before any indexes.
+    """
+    tasks = make_tasks(args.tasks)
+    for task in tasks[::3]:
+        task.mark_complete()
+    operations = {
+        "--list": ("ordered", {"incomplete": True}),
+        "--list --limit 20": ("ordered", {"incomplete": True, "limit": 20}),
+        "--report": ("ordered", {}),
+        "--query": ("search", {"search_terms": ["eggs", "tax"]}),
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        objects = PickleStorage(os.path.join(tmp, "tasks.pkl"))
+        columns = ColumnarStorage(os.path.join(tmp, "tasks.cols"))
+        for storage in (objects, columns):
+            storage.append_many(tasks)
+            storage.flush()
+
+        def run(storage, implementation, method, kwargs):
+            storage = type(storage)(storage.path)
+            storage.load()
+            return list(getattr(implementation, method)(storage, **kwargs))
+
+        print(f"{'Command':<18} {'Objects (ms)':>13} {'Columnar (ms)':>14}")
+        for name, (method, kwargs) in operations.items():
+            _, scan_time = timed(lambda: run(objects, TaskStorage, method, kwargs))
+            _, column_time = timed(lambda: run(columns, ColumnarStorage, method, kwargs))
+            print(f"{name:<18} {scan_time * 1000:>13.1f} {column_time * 1000:>14.1f}")
+
+
+def bench_vectorized(args):
+    """Compare the columnar storage's pure-Python and NumPy paths."""
+    import Task as task_module
+    if task_module._numpy() is None:
+        print("NumPy is not installed; only the pure-Python path is available")
+        return
+    tasks = make_tasks(args.tasks)
+    for task in tasks[::3]:
+        task.mark_complete()
+    storage = ColumnarStorage(os.devnull)
+    storage.append_many(tasks)
+    operations = {
+        "--list": lambda: storage.ordered(incomplete=True),
+        "--list --limit 20": lambda: storage.ordered(incomplete=True, limit=20),
+        "--report --limit 20": lambda: storage.ordered(limit=20),
+        "--query --limit 20": lambda: storage.search_ordered(["eggs", "tax"], limit=20),
+    }
+    print(f"{'Command':<20} {'Python (ms)':>12} {'NumPy (ms)':>11}")
+    for name, operation in operations.items():
+        storage.VECTORIZE_MIN_TASKS = float("inf")
+        _, python_time = timed(lambda: list(operation()))
+        storage.VECTORIZE_MIN_TASKS = 0
+        _, numpy_time = timed(lambda: list(operation()))
+        print(f"{name:<20} {python_time * 1000:>12.1f} {numpy_time * 1000:>11.1f}")
+
+
+class DictTask:
+    """A task laid out like Task was before it had slots."""
+
+    def __init__(self, task):
+        self.created = task.created
+        self.completed = task.completed
+        self.name = task.name
+        self.unique_id = task.unique_id
+        self.priority = task.priority
+        self.due_date = task.due_date
+
+
+def loaded_size(objects):
+    """Return the bytes allocated to unpickle `objects`, as a load would."""
+    data = pickle.dumps(objects, protocol=pickle.HIGHEST_PROTOCOL)
+    tracemalloc.start()
+    try:
+        loaded = pickle.loads(data)
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del loaded
+    return size
+
+
+def bench_memory(args):
+    """Compare bytes per resident task with and without `__slots__`.
+
+    Sizes are measured with tracemalloc while unpickling the tasks, so
+    they include each task's name and dates as loaded from disk.
+    """
+    tasks = make_tasks(args.tasks)
+    for task in tasks[::3]:
+        task.mark_complete()
+    layouts = {
+        "__dict__": [DictTask(task) for task in tasks],
+        "__slots__": tasks,
+    }
+    print(f"{'Layout':<10} {'Bytes/task':>10} {'Total (MB)':>11}")
+    for name, objects in layouts.items():
+        size = loaded_size(objects)
+        print(f"{name:<10} {size / len(objects):>10,.0f} {size / 1e6:>11.1f}")
+
+
+# Modules that `task_manager.py --list` must not import on the default
+# backend; the startup benchmark fails if one of them shows up.
+FAST_PATH_EXCLUDED_MODULES = {"argparse", "csv", "json", "pathlib", "socket", "sqlite3"}
+
+
+def bench_startup(args):
+    """Measure `task_manager.py --list` startup with `-X importtime`.
+
+    The tasks are saved to a temporary home directory first, so the run
+    includes loading them. Exits with status 1 if the command imported
+    any of `FAST_PATH_EXCLUDED_MODULES`.
+    """
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "task_manager.py")
+    with tempfile.TemporaryDirectory() as home:
+        storage = JournalStorage(os.path.join(home, ".tasks.pkl"), os.path.join(home, ".tasks.journal"))
+        storage.load()
+        storage.append_many(make_tasks(args.tasks))
+        storage.compact()
+
+        env = dict(os.environ, HOME=home)
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+        env.pop("TASK_MANAGER_SOCKET", None)
+        command = [sys.executable, "-X", "importtime", script, "--list"]
+        subprocess.run(command, env=env, capture_output=True, check=True)  # warm the bytecode cache
+
+        runs = []
+        for _ in range(5):
+            result, seconds = timed(lambda: subprocess.run(command, env=env, capture_output=True,
+                                                           text=True, check=True))
+            runs.append(seconds)
+
+    # Lines look like "import time:  self [us] | cumulative | package"
+    imports = []
+    for line in result.stderr.splitlines():
+        fields = line.split("|")
+        if line.startswith("import time:") and fields[1].strip().isdigit():
+            imports.append((int(fields[1]), int(fields[0].split(":")[1]), fields[2].strip()))
+    total = sum(self_us for _, self_us, _ in imports)
+    print(f"--list with {args.tasks} tasks: {min(runs) * 1000:.1f} ms wall (best of {len(runs)}), "
+          f"{total / 1000:.1f} ms importing {len(imports)} modules")
+    print(f"{'Module':<24} {'Cumulative (ms)':>15}")
+    for cumulative, _, name in sorted(imports, reverse=True)[:10]:
+        print(f"{name:<24} {cumulative / 1000:>15.1f}")
+
+    imported = {name.split(".")[0] for _, _, name in imports}
+    unwanted = sorted(imported & FAST_PATH_EXCLUDED_MODULES)
+    if unwanted:
+        print(f"Error: --list imported {', '.join(unwanted)}")
+        sys.exit(1)
+
+
+def bench_done(args):
+    """Measure one `--done`, from opening the storage to saving, per backend."""
+    tasks = make_tasks(args.tasks)
+    with tempfile.TemporaryDirectory() as tmp:
+        storages = {
+            "journal": lambda: JournalStorage(os.path.join(tmp, "t.pkl"), os.path.join(tmp, "t.journal")),
+            "sqlite": lambda: SQLiteStorage(os.path.join(tmp, "t.db")),
+            "columnar": lambda: ColumnarStorage(os.path.join(tmp, "t.cols")),
+            "mmap": lambda: MmapStorage(os.path.join(tmp, "t.bin"), os.path.join(tmp, "t.names")),
+        }
+        print(f"{'Backend':<9} {'--done (ms)':>11}")
+        for name, make_storage in storages.items():
+            storage = make_storage()
+            storage.load()
+            storage.append_many(tasks)
+            storage.compact()
+
+            def done():
+                done_tasks = Tasks(make_storage())
+                done_tasks.done(tasks[len(tasks) // 2].unique_id)
+                done_tasks.pickle_tasks()
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                _, seconds = timed(done)
+            print(f"{name:<9} {seconds * 1000:>11.1f}")
+
+
+def bench_durability(args):
+    """Measure the cost of each durability level per backend.
+
+    Adds tasks in batches of 100, saving after each batch as `--batch`
+    does by default; at level "op" every add is also saved on its own.
+    """
+    count = min(args.tasks, 1000)
+    names = [task.name for task in make_tasks(count)]
+    backends = {
+        "journal": lambda tmp: JournalStorage(os.path.join(tmp, "t.pkl"), os.path.join(tmp, "t.journal")),
+        "pickle": lambda tmp: PickleStorage(os.path.join(tmp, "t.pkl")),
+        "sqlite": lambda tmp: SQLiteStorage(os.path.join(tmp, "t.db")),
+        "mmap": lambda tmp: MmapStorage(os.path.join(tmp, "t.bin"), os.path.join(tmp, "t.names")),
+    }
+    print(f"Microseconds per added task ({count} tasks, saved every 100)")
+    print(f"{'Backend':<9}" + "".join(f"{level:>9}" for level in DURABILITY_LEVELS))
+    for name, make_storage in backends.items():
+        row = f"{name:<9}"
+        for level in DURABILITY_LEVELS:
+            with tempfile.TemporaryDirectory(dir=args.dir) as tmp, open(os.devnull, "w") as devnull, \
+                    contextlib.redirect_stdout(devnull):
+                tasks = Tasks(make_storage(tmp), durability=level)
+
+                def add_all():
+                    for i, task_name in enumerate(names, 1):
+                        tasks.add(task_name)
+                        if i % 100 == 0:
+                            tasks.pickle_tasks()
+                _, seconds = timed(add_all)
+            row += f"{seconds / count * 1e6:>9,.0f}"
+        print(row)
+
+
+def file_storages(tmp):
+    """Return a factory per file-backed storage, keeping its files in `tmp`."""
+    return {
+        "journal": lambda: JournalStorage(os.path.join(tmp, "t.pkl"), os.path.join(tmp, "t.journal")),
+        "pickle": lambda: PickleStorage(os.path.join(tmp, "t.pkl")),
+        "sqlite": lambda: SQLiteStorage(os.path.join(tmp, "t.db")),
+        "columnar": lambda: ColumnarStorage(os.path.join(tmp, "t.cols")),
+        "mmap": lambda: MmapStorage(os.path.join(tmp, "t.bin"), os.path.join(tmp, "t.names")),
+    }
+
+
+def concurrent_writer(tmp, backend, mode, writer, count):
+    """Add `count` tasks, each in its own load-add-save cycle, as separate
+    `task_manager --add` runs would. Returns the number that failed."""
+    failures = 0
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for i in range(count):
+            try:
+                tasks = Tasks(file_storages(tmp)[backend](), concurrency=mode)
+                tasks.add(f"writer{writer} task{i}")
+                tasks.pickle_tasks()
+            except Exception:
+                failures += 1
+    return failures
+
+
+def bench_concurrency(args):
+    """Stress each concurrency mode with parallel writers and count lost tasks.
+
+    Exits with status 1 if "lock" or "optimistic" lose or duplicate a
+    task. "none" is expected to, and only runs on the default journal
+    backend, for comparison; on SQLite it mostly waits out lock timeouts.
+    """
+    import multiprocessing
+
+    writers, count = 8, max(1, min(args.tasks, 25))
+    print(f"{writers} writers adding {count} tasks each")
+    print(f"{'Backend':<9} {'Mode':<11} {'Saved':>6} {'Lost':>5} {'Errors':>7} {'Time (s)':>9}")
+    unsafe = []
+    with multiprocessing.Pool(writers) as pool:
+        for backend in file_storages(None):
+            for mode in CONCURRENCY_MODES:
+                if mode == "none" and backend != "journal":
+                    continue
+                with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+                    jobs = [(tmp, backend, mode, writer, count) for writer in range(writers)]
+                    errors, seconds = timed(lambda: sum(pool.starmap(concurrent_writer, jobs)))
+                    storage = file_storages(tmp)[backend]()
+                    storage.load()
+                    saved = {task.name for task in storage}
+                    ids = [task.unique_id for task in storage]
+                lost = writers * count - len(saved)
+                print(f"{backend:<9} {mode:<11} {len(saved):>6} {lost:>5} {errors:>7} {seconds:>9.2f}")
+                if mode != "none" and (lost or errors or len(ids) != len(set(ids))):
+                    unsafe.append(f"{backend}/{mode}")
+    if unsafe:
+        print(f"Error: lost or duplicated tasks with {', '.join(unsafe)}")
+        sys.exit(1)
+
+
+BENCHMARKS = {
+    "query-terms": bench_query_terms,
+    "render": bench_render,
+    "import": bench_import,
+    "startup": bench_startup,
+    "memory": bench_memory,
+    "columnar": bench_columnar,
+    "vectorized": bench_vectorized,
+    "done": bench_done,
+    "durability": bench_durability,
+    "concurrency": bench_concurrency,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Task Manager benchmarks")
+    parser.add_argument("benchmark", choices=BENCHMARKS, help="Benchmark to run")
+    parser.add_argument(
+        "--tasks",
+        type=int,
+        default=20000,
+        help="Number of tasks to generate (default: 20000)"
+    )
+    parser.add_argument(
+        "--dir",
+        help="Directory for the durability benchmark's files (default: the system temp directory, "
+             "which may not be on a real disk)"
+    )
+    args = parser.parse_args()
+    BENCHMARKS[args.benchmark](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,12 +9,21 @@ allow you to enter tasks, save them to a file, and retrieve them...all
 without moving your hands from the keyboard.
 """
 
-import argparse
+import os
 import sys
-from Task import Tasks
 
+# Everything else is imported where it is used: a forwarded command or a
+# plain --list should not pay for argparse, socket or json at startup.
+DEFAULT_SOCKET = os.path.join(os.path.expanduser("~"), ".tasks.sock")
+# Commands simple enough to run without building the argument parser.
+FAST_COMMANDS = {"--list": "list", "--report": "report"}
+
+
+def build_parser():
+    """Build the command-line argument parser."""
+    import argparse
+    from Task import OUTPUT_FORMATS
 
-def main():
     parser = argparse.ArgumentParser(
         description="Task Manager - Manage your tasks from the command line"
     )
@@ -54,6 +63,32 @@ def main():
         required=False,
         help="Search for tasks matching the given terms"
     )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        required=False,
+        help="Show at most this many tasks with --list, --report or --query"
+    )
+    parser.add_argument(
+        "--offset",
+        type=int,
+        required=False,
+        default=0,
+        help="Skip this many tasks with --list, --report or --query (default: 0)"
+    )
+    parser.add_argument(
+        "--cursor",
+        type=str,
+        required=False,
+        help="Continue a --list, --report or --query after a previous page"
+    )
+    parser.add_argument(
+        "--format",
+        type=str,
+        choices=OUTPUT_FORMATS,
+        default="table",
+        help="Output format for --list, --report or --query (default: table)"
+    )
     parser.add_argument(
         "--done",
         type=int,
@@ -66,35 +101,361 @@ def main():
         required=False,
         help="Delete a task by its ID"
     )
-    args = parser.parse_args()
-    tasks = Tasks()
-    
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Fold the change journal into a fresh snapshot"
+    )
+    parser.add_argument(
+        "--import",
+        dest="import_file",
+        type=str,
+        required=False,
+        help="Add tasks from a .csv, .tsv, .ndjson or .jsonl file with name, "
+             "priority and due columns"
+    )
+    parser.add_argument(
+        "--export",
+        type=str,
+        required=False,
+        help="Write tasks to a .csv, .tsv, .ndjson or .jsonl file, or to stdout "
+             "with '-' and --format"
+    )
+    parser.add_argument(
+        "--status",
+        type=str,
+        choices=("all", "completed", "incomplete"),
+        default="all",
+        help="With --export, only write tasks with this status (default: all)"
+    )
+    parser.add_argument(
+        "--due-from",
+        type=str,
+        required=False,
+        help="With --export, only write tasks due on or after this MM/DD/YYYY date"
+    )
+    parser.add_argument(
+        "--due-to",
+        type=str,
+        required=False,
+        help="With --export, only write tasks due on or before this MM/DD/YYYY date"
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Run commands read from stdin, one per line, saving once at the end"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        required=False,
+        help="With --batch, also save after every this many changes"
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run a task server on the Unix socket named by TASK_MANAGER_SOCKET "
+             "(default: ~/.tasks.sock)"
+    )
+    return parser
+
+
+def run_command(args, parser, tasks, save=True):
+    """Run the command selected by parsed arguments against `tasks`.
+
+    Args:
+        args: Parsed arguments from `build_parser`
+        parser: The parser, for printing help
+        tasks (Tasks): The loaded task collection
+        save (bool): If False, leave saving changes to the caller
+    """
     try:
         if args.add:
             tasks.add(args.add, args.priority, args.due)
-            tasks.pickle_tasks()
+            if save:
+                tasks.pickle_tasks()
         elif args.list:
-            tasks.list()
+            tasks.list(args.limit, args.offset, args.cursor, args.format)
         elif args.report:
-            tasks.report()
+            tasks.report(args.limit, args.offset, args.cursor, args.format)
         elif args.query:
             search_terms = " ".join(args.query)
-            tasks.query(search_terms)
+            tasks.query(search_terms, args.limit, args.offset, args.cursor, args.format)
         elif args.done:
             tasks.done(args.done)
-            tasks.pickle_tasks()
+            if save:
+                tasks.pickle_tasks()
         elif args.delete:
             tasks.delete(args.delete)
-            tasks.pickle_tasks()
+            if save:
+                tasks.pickle_tasks()
+        elif args.compact:
+            tasks.compact()
+        elif args.import_file:
+            tasks.import_tasks(args.import_file)
+        elif args.export:
+            fmt = args.format if args.format != "table" else None
+            tasks.export_tasks(args.export, fmt, args.status, args.due_from, args.due_to)
+        elif args.batch:
+            failures = run_batch(sys.stdin, parser, tasks, args.batch_size)
+            if failures:
+                sys.exit(1)
         else:
             parser.print_help()
     except ValueError as e:
-        print("There was an error in creating your task. Run \"main.py -h\" for usage instructions.")
+        if args.add:
+            print("There was an error in creating your task. Run \"main.py -h\" for usage instructions.")
+        else:
+            print(f"Error: {e}")
         sys.exit(1)
     except Exception as e:
         print(f"Error: {e}")
         sys.exit(1)
 
 
+def batch_argv(line):
+    """Turn one line of batch input into command-line arguments.
+
+    A line is either command-line arguments, e.g. `--add "buy eggs"
+    --priority 2`, or a JSON object mapping the same option names to
+    values, e.g. {"add": "buy eggs", "priority": 2}. In JSON, `true`
+    enables a flag such as "list", and a list supplies several values,
+    as for "query".
+
+    Args:
+        line (str): The input line, without blank or comment lines
+
+    Returns:
+        list: Arguments for `build_parser`
+
+    Raises:
+        ValueError: If the line is not valid JSON or shell syntax
+    """
+    import json
+    import shlex
+
+    if not line.startswith("{"):
+        return shlex.split(line)
+    argv = []
+    for option, value in json.loads(line).items():
+        flag = f"--{option.replace('_', '-')}"
+        if value is True:
+            argv.append(flag)
+        elif isinstance(value, list):
+            argv += [flag] + [str(item) for item in value]
+        elif value is not None and value is not False:
+            argv += [flag, str(value)]
+    return argv
+
+
+def run_batch(lines, parser, tasks, batch_size=None):
+    """Run many commands against one loaded task collection.
+
+    Changes are saved once at the end, or after every `batch_size`
+    changes if given, instead of once per command. A failing command is
+    reported with its line number and the batch continues. The store's
+    lock is released after every command (see `Tasks.unlock`), so other
+    commands are not held up while the next line is awaited; with the
+    sqlite and mmap backends this saves each change as it is made.
+
+    Args:
+        lines: Iterable of input lines (see `batch_argv`)
+        parser: Parser used to parse each line's arguments
+        tasks (Tasks): The loaded task collection
+        batch_size (int or None): Save after this many changes
+
+    Returns:
+        int: Number of commands that failed
+    """
+    failures = 0
+    unsaved = 0
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            args = parser.parse_args(batch_argv(line))
+            if args.batch or args.serve:
+                parser.error("--batch and --serve cannot be used inside a batch")
+            run_command(args, parser, tasks, save=False)
+        except (SystemExit, ValueError) as e:
+            if isinstance(e, ValueError) or e.code:
+                failures += 1
+                print(f"Error: Batch line {line_number} failed: {line}", file=sys.stderr)
+            continue
+        finally:
+            # Don't keep other commands waiting while the next line is read.
+            tasks.unlock()
+        if args.add or args.done or args.delete:
+            unsaved += 1
+            if batch_size and unsaved >= batch_size:
+                tasks.pickle_tasks()
+                unsaved = 0
+    if unsaved:
+        tasks.pickle_tasks()
+    return failures
+
+
+def serve(socket_path, parser):
+    """Serve commands from clients over a Unix socket until interrupted.
+
+    Tasks are loaded once and stay in memory between commands, so each
+    command skips interpreter startup, argument parser construction and
+    loading the store. Mutations are still saved as they happen. Before
+    each command the server checks the store's version stamp and reloads
+    if another process saved in the meantime, so commands that bypass it
+    are seen too; with TASKS_CONCURRENCY=none there is no stamp, and they
+    are not seen until it restarts.
+
+    Each connection carries one JSON request line, {"argv": [...],
+    "cwd": "...", "stdin": "..."}, answered by one JSON reply,
+    {"status": int, "stdout": str, "stderr": str}, after which the
+    server closes it. "stdin" is only sent for --batch.
+
+    Args:
+        socket_path (str): Path of the Unix socket to listen on
+        parser: Parser used to parse each request's arguments
+    """
+    import io
+    import json
+    import signal
+    import socketserver
+    from contextlib import redirect_stderr, redirect_stdout
+    from Task import Tasks
+
+    class TaskRequestHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            stdout, stderr = io.StringIO(), io.StringIO()
+            status = 0
+            stdin, cwd = sys.stdin, os.getcwd()
+            with redirect_stdout(stdout), redirect_stderr(stderr):
+                try:
+                    request = json.loads(self.rfile.readline())
+                    sys.stdin = io.StringIO(request.get("stdin", ""))
+                    os.chdir(request.get("cwd") or cwd)
+                    args = parser.parse_args(request["argv"])
+                    tasks.refresh()
+                    run_command(args, parser, tasks)
+                except SystemExit as e:
+                    status = e.code if isinstance(e.code, int) else int(e.code is not None)
+                except Exception as e:
+                    status = 1
+                    print(f"Error: {e}", file=sys.stderr)
+                finally:
+                    sys.stdin = stdin
+                    os.chdir(cwd)
+            reply = {"status": status, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+            self.wfile.write(json.dumps(reply).encode())
+
+    tasks = Tasks()
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    with socketserver.UnixStreamServer(socket_path, TaskRequestHandler) as server:
+        os.chmod(socket_path, 0o600)
+        print(f"Serving tasks on {socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.remove(socket_path)
+
+
+def connect(socket_path):
+    """Connect to a task server, or return None if none is listening."""
+    import socket
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def forward(sock, argv):
+    """Send a command to a task server and relay its output.
+
+    Args:
+        sock: Socket connected to the server
+        argv (list): Command-line arguments to run
+
+    Returns:
+        int: The command's exit status
+    """
+    import json
+    import socket
+
+    with sock:
+        request = {"argv": argv, "cwd": os.getcwd()}
+        if "--batch" in argv:
+            request["stdin"] = sys.stdin.read()
+        try:
+            sock.sendall(json.dumps(request).encode() + b"\n")
+            sock.shutdown(socket.SHUT_WR)
+            data = b"".join(iter(lambda: sock.recv(65536), b""))
+        except OSError as e:
+            print(f"Error: Lost the connection to the task server: {e}", file=sys.stderr)
+            return 1
+    if not data:
+        print("Error: The task server closed the connection without replying", file=sys.stderr)
+        return 1
+    reply = json.loads(data)
+    sys.stdout.write(reply["stdout"])
+    sys.stderr.write(reply["stderr"])
+    return reply["status"]
+
+
+def run_fast_command(option):
+    """Run a `FAST_COMMANDS` option without building the argument parser.
+
+    Args:
+        option (str): The only command-line argument
+
+    Returns:
+        bool: False if the task list could not be opened, in which case
+            the caller should run the command the usual way to report why
+    """
+    from Task import Tasks
+    try:
+        tasks = Tasks()
+    except ValueError:
+        return False
+    try:
+        getattr(tasks, FAST_COMMANDS[option])()
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    return True
+
+
+def main():
+    argv = sys.argv[1:]
+    socket_path = os.environ.get("TASK_MANAGER_SOCKET")
+    if socket_path and "--serve" not in argv:
+        sock = connect(socket_path)
+        if sock is not None:
+            sys.exit(forward(sock, argv))
+        print(f"Warning: No task server on {socket_path}; running locally", file=sys.stderr)
+
+    if len(argv) == 1 and argv[0] in FAST_COMMANDS and run_fast_command(argv[0]):
+        return
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.serve:
+        serve(socket_path or DEFAULT_SOCKET, parser)
+        return
+
+    from Task import Tasks
+    try:
+        tasks = Tasks()
+    except ValueError as e:
+        parser.error(str(e))
+    run_command(args, parser, tasks)
+
+
 if __name__ == "__main__":
     main()